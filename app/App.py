@@ -1,56 +1,28 @@
+from __future__ import annotations
+
+import logging
+import os
 import re
+import sys
+import threading
 from pathlib import Path
+from typing import TYPE_CHECKING, Any, Optional
 
-import numpy as np
-import pandas as pd
-import plotly.express as px
 import streamlit as st
 
-from src.integrations.marketaux import get_ticker_and_industry_news
-from src.reports.news_prompt import build_llm_context
-
-TICKERS = {
-    "Apple": "AAPL",
-    "Microsoft": "MSFT",
-    "NVIDIA": "NVDA",
-    "Conagra Brands": "CAG",
-    "Hershey": "HSY",
-    "Coca-Cola Europacific Partners": "CCEP",
-    "Kroger": "KR",
-    "Sysco": "SYY",
-    "Campbell Soup Company": "CPB",
-    "Keurig Dr Pepper": "KDP",
-    "PepsiCo": "PEP",
-    "Tyson Foods": "TSN",
-    "JM Smucker": "SJM",
-    "Kraft Heinz": "KHC",
-    "Philip Morris International": "PM",
-    "Altria": "MO",
-    "Hormel Foods": "HRL",
-    "Estée Lauder": "EL",
-    "Colgate-Palmolive": "CL",
-    "Kellogg": "K",
-    "General Mills": "GIS",
-    "Kimberly-Clark": "KMB",
-    "Clorox": "CLX",
-    "McCormick & Company": "MKC",
-    "Coca-Cola": "KO",
-    "Walmart": "WMT",
-    "Costco": "COST",
-    "Dollar General": "DG",
-    "Dollar Tree": "DLTR",
-    "Walgreens Boots Alliance": "WBA",
-    "Monster Beverage": "MNST",
-    "Constellation Brands": "STZ",
-    "Mondelez International": "MDLZ",
-    "Molson Coors": "TAP",
-    "Lamb Weston": "LW",
-    "Church & Dwight": "CHD",
-    "Brown-Forman": "BF.B",
-}
+from src.universe import TICKERS
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+# İlk boyama (hisse seçilmeden önceki sayfa) sadece streamlit + evren listesiyle çizilir. pandas, numpy,
+# plotly, requests ve model/rapor modülleri ilgili fonksiyon veya bölüm ilk kez çalıştığında yüklenir;
+# import süreleri için: python -m bench.import_profile
 
 LOGO_DIR = Path(__file__).resolve().parent / "assets" / "logos"
 
+logger = logging.getLogger(__name__)
+
 
 def ticker_to_logo_filename(ticker: str) -> str:
     safe = re.sub(r"[^A-Za-z0-9]+", "_", ticker).strip("_")
@@ -91,6 +63,8 @@ def render_logo_or_placeholder(ticker: str) -> None:
 def _fmt_dt(published_at: str) -> str:
     if not published_at:
         return ""
+    import pandas as pd
+
     try:
         dt = pd.to_datetime(published_at)
         if getattr(dt, "tzinfo", None) is not None:
@@ -124,16 +98,114 @@ def render_news_item(idx: int, kind_label: str, it: dict) -> None:
     st.markdown("---")
 
 
+def render_marketaux_diagnostics() -> None:
+    # modül henüz yüklenmediyse hiç istek yapılmamıştır: sadece diagnostik için requests yükleme
+    marketaux = sys.modules.get("src.integrations.marketaux")
+    if marketaux is None:
+        st.caption("Henüz Marketaux isteği yapılmadı.")
+        return
+    m = marketaux.get_metrics()
+
+    c1, c2 = st.columns(2)
+    c1.metric("İstek", m["requests"])
+    c2.metric("Alınan veri", f"{m['bytes'] / 1024:.1f} KB")
+
+    quota = m.get("quota", {})
+    for family, title in (("usage", "Günlük kota"), ("rate", "Hız sınırı")):
+        q = quota.get(family, {})
+        if q.get("remaining") is not None:
+            st.caption(f"{title}: {q['remaining']} / {q.get('limit', '?')} kaldı")
+    if not any(family in quota for family in ("usage", "rate")):
+        st.caption("Kalan kota: başlık bilgisi yok")
+
+    if m["endpoints"]:
+        import pandas as pd
+
+        rows = [
+            {
+                "Endpoint": path,
+                "Adet": ep["count"],
+                "Retry": ep["retries"],
+                "Hata": ep["errors"],
+                "Ort. ms": round(ep["avg_ms"], 1),
+                "Maks. ms": round(ep["max_ms"], 1),
+                "KB": round(ep["bytes"] / 1024, 1),
+            }
+            for path, ep in m["endpoints"].items()
+        ]
+        st.dataframe(pd.DataFrame(rows), use_container_width=True, hide_index=True)
+
+        hist = pd.DataFrame({path: ep["histogram"] for path, ep in m["endpoints"].items()})
+        st.bar_chart(hist)
+
+    for name, c in m["caches"].items():
+        # hit oranı negatif cache isabetlerini de (API'ye gitmeden dönen "bulunamadı") kapsar
+        st.caption(
+            f"{name} cache: {c.get('hit', 0)} hit / {c.get('negative_hit', 0)} negatif hit / "
+            f"{c.get('miss', 0)} miss (%{c['hit_rate'] * 100:.0f})"
+        )
+
+
+@st.cache_resource
+def price_store() -> Any:
+    from src.data.price_store import get_price_store
+
+    return get_price_store()
+
+
+@st.cache_resource
+def news_store() -> Any:
+    from src.integrations.news_store import get_news_store
+
+    return get_news_store()
+
+
+@st.cache_resource
+def prediction_table() -> Any:
+    from src.models.inference import get_prediction_table
+
+    return get_prediction_table()
+
+
+@st.cache_resource
+def subscriber_store() -> Any:
+    from src.reports.subscribers import get_subscriber_store
+
+    return get_subscriber_store()
+
+
 @st.cache_data
 def generate_dummy_price_series(ticker: str) -> pd.DataFrame:
+    import numpy as np
+    import pandas as pd
+
     np.random.seed(hash(ticker) % 2**32)
     dates = pd.date_range(end=pd.Timestamp.today(), periods=60)
     prices = np.cumsum(np.random.randn(len(dates)) * 0.5 + 0.2) + 100
     return pd.DataFrame({"Tarih": dates, "Fiyat": prices})
 
 
+def load_price_series(ticker: str, days: Optional[int] = 365) -> pd.DataFrame:
+    # chart_data (ticker, aralık, çözünürlük) ile önbelleğe alır ve yeni bar gelince yeniler;
+    # geçmiş ne kadar uzun olursa olsun en fazla CHART_WIDTH_PX nokta döner
+    import pandas as pd
+
+    from src.data.chart_data import chart_series
+
+    store = price_store()
+    last = store.last_date(ticker)
+    if last is None:
+        return pd.DataFrame(columns=["Tarih", "Fiyat"])
+    start = None if days is None else str((last - pd.Timedelta(days=days)).date())
+    series = chart_series(ticker, start=start, store=store)
+    return pd.DataFrame({"Tarih": series.index, "Fiyat": series.to_numpy()})
+
+
 @st.cache_data
 def run_dummy_models(ticker: str) -> dict:
+    import numpy as np
+    import pandas as pd
+
     np.random.seed((hash(ticker) + 1337) % 2**32)
     metrics = {
         "expected_return": float(np.round(np.random.uniform(-5, 10), 2)),
@@ -148,6 +220,8 @@ def run_dummy_models(ticker: str) -> dict:
 
 @st.cache_data
 def dummy_ticker_about(ticker: str) -> str:
+    import numpy as np
+
     np.random.seed((hash(ticker) + 2026) % 2**32)
     profiller = [
         "istikrarlı nakit akışı üreten defansif bir şirket",
@@ -183,18 +257,46 @@ def dummy_ticker_about(ticker: str) -> str:
     )
 
 
+@st.cache_resource
+def start_entity_warmup() -> threading.Thread:
+    # process başına bir kez: tüm evrenin entity'lerini arka planda çöz. Import da thread içinde:
+    # HTTP oturumu, entity store ve requests yüklemesi ilk boyamayı bekletmez
+    def _run() -> None:
+        # hata dashboard'u durdurmaz (lazy çözümleme devam eder) ama loglanır
+        if not os.getenv("MARKETAUX_API_TOKEN", "").strip():
+            logger.warning("MARKETAUX_API_TOKEN yok: entity warm-up atlandı")
+            return
+        try:
+            from src.integrations.warmup import warm_up
+
+            status = warm_up(TICKERS)
+        except Exception:
+            logger.exception("Entity warm-up başarısız")
+            return
+        missing = [t for t, ok in status.items() if not ok]
+        if missing:
+            logger.warning("Entity warm-up: çözülemeyenler: %s", ", ".join(missing))
+
+    t = threading.Thread(target=_run, name="entity-warmup", daemon=True)
+    t.start()
+    return t
+
+
 @st.cache_data(ttl=600)
 def fetch_marketaux_news(selected_ticker: str, selected_label: str) -> dict:
+    from src.integrations.marketaux import TICKER_NEWS_TTL, get_ticker_and_industry_news
+
     return get_ticker_and_industry_news(
         selected_ticker,
         company_name=selected_label,
         country="us",
         n=10,
-        per_req=3,
+        ticker_max_age=TICKER_NEWS_TTL,
     )
 
 
 st.set_page_config(page_title="FinAnalytics", layout="wide")
+start_entity_warmup()
 st.title("FinAnalytics Dashboard")
 
 st.sidebar.header("Kontroller")
@@ -216,56 +318,110 @@ if st.sidebar.button("E-postayı Kaydet"):
 
 saved_email = st.session_state.get("saved_email", "")
 
+# yer sidebar'da ayrılır, içerik script sonunda (haber çekildikten sonra) doldurulur: aksi halde
+# diagnostikler bir önceki rerun'ın sayaçlarını gösterir
+diagnostics_panel = st.sidebar.expander("Marketaux diagnostikleri", expanded=False)
+
 if not selected_ticker:
     st.write(
         "FinAnalytics, seçilen hisse için kısa/orta/uzun vadeli model çıktıları ve "
         "haber/sektör verilerini göstermeyi hedefleyen bir Streamlit dashboard şablonudur. "
         "Dashboard bölümlerini açmak için soldan bir hisse seçin."
     )
+    with diagnostics_panel:
+        render_marketaux_diagnostics()
     st.stop()
 
+if st.session_state.get("last_viewed_ticker") != selected_ticker:
+    # prefetch zamanlayıcısı sık bakılan ticker'ları önce yeniler
+    st.session_state["last_viewed_ticker"] = selected_ticker
+    try:
+        news_store().record_view(selected_ticker)
+    except Exception:
+        pass
+
 left, right = st.columns([5, 1.5], vertical_alignment="center")
 with left:
     st.markdown(f"## {selected_label} ({selected_ticker})")
 with right:
     render_logo_or_placeholder(selected_ticker)
 
-tabs = st.tabs(["Hakkında", "Model Çıktıları", "Haber Bülteni", "Raporlar"])
+# st.tabs her rerun'da tüm sekme gövdelerini (ve içlerindeki import'ları) çalıştırır:
+# bölüm seçici ile sadece aktif bölümün kodu çalışır
+section = st.radio(
+    "Bölüm",
+    ["Hakkında", "Model Çıktıları", "Haber Bülteni", "Raporlar"],
+    horizontal=True,
+    key="section",
+    label_visibility="collapsed",
+)
 
-with tabs[0]:
+if section == "Hakkında":
     st.header("Hakkında")
     st.write(dummy_ticker_about(selected_ticker))
 
-with tabs[1]:
-    st.header("Model Çıktıları (Sahte)")
-
-    results = run_dummy_models(selected_ticker)
-    metrics = results["metrics"]
-    scenario = results["scenario"]
+elif section == "Model Çıktıları":
+    import pandas as pd
+    import plotly.graph_objects as go
+
+    horizon_labels = {"Kısa": "short", "Orta": "mid", "Uzun": "long"}
+    horizon = st.radio("Vade", list(horizon_labels), horizontal=True, key="model_horizon")
+
+    # batch işinin (python -m src.models.inference) tablosundan O(1) okuma; yoksa sahte çıktılar
+    table = prediction_table()
+    row = table.lookup(selected_ticker, horizon_labels[horizon])
+    if row:
+        st.header("Model Çıktıları")
+        st.caption(f"Tahmin tablosu sürümü: {table.version} | Veri tarihi: {table.asof}")
+        metrics = row
+        scenario = pd.DataFrame(
+            {"Senaryo": ["Ayı", "Baz", "Boğa"], "Getiri (%)": [row["bear"], row["base"], row["bull"]]}
+        )
+    else:
+        st.header("Model Çıktıları (Sahte)")
+        results = run_dummy_models(selected_ticker)
+        metrics = results["metrics"]
+        scenario = results["scenario"]
 
     c1, c2, c3 = st.columns(3)
     c1.metric("Beklenen Getiri", f"{metrics['expected_return']}%")
     c2.metric("Volatilite", f"{metrics['volatility']}%")
     c3.metric("Güven", f"{metrics['confidence']}%")
 
-    df_prices = generate_dummy_price_series(selected_ticker)
-    fig = px.line(df_prices, x="Tarih", y="Fiyat", title=f"{selected_ticker} Fiyat (Sahte)")
+    range_days = {"3A": 90, "1Y": 365, "5Y": 5 * 365, "Tümü": None}
+    price_range = st.radio("Aralık", list(range_days), index=1, horizontal=True, key="price_range")
+
+    df_prices = load_price_series(selected_ticker, range_days[price_range])
+    price_title = f"{selected_ticker} Fiyat (Kapanış)"
+    if df_prices.empty:
+        # depoda veri yoksa: python -m src.data.price_store import <TICKER> <CSV>
+        df_prices = generate_dummy_price_series(selected_ticker)
+        price_title = f"{selected_ticker} Fiyat (Sahte)"
+    # WebGL izi: SVG yerine GPU'da çizilir, nokta sayısı arttıkça tarayıcı yavaşlamaz
+    fig = go.Figure(go.Scattergl(x=df_prices["Tarih"], y=df_prices["Fiyat"], mode="lines", name=selected_ticker))
+    fig.update_layout(title=price_title, xaxis_title="Tarih", yaxis_title="Fiyat")
     st.plotly_chart(fig, use_container_width=True)
 
     st.write("Senaryo Çıktıları")
     st.dataframe(scenario, use_container_width=True)
 
-with tabs[2]:
+elif section == "Haber Bülteni":
     st.header("Haber Bülteni")
 
     use_marketaux = st.toggle("Marketaux ile gerçek haberleri çek", value=True, key="use_marketaux")
 
     if use_marketaux:
+        from src.reports.news_prompt import build_llm_context
+
         try:
             with st.spinner("Marketaux haberleri çekiliyor..."):
                 result = fetch_marketaux_news(selected_ticker, selected_label)
 
-            st.caption(f"Symbol: {result['symbol']} | Industry: {result['industry']}")
+            reqs = result.get("requests", {})
+            st.caption(
+                f"Symbol: {result['symbol']} | Industry: {result['industry']} | "
+                f"İstek: {reqs.get('ticker', 0)} + {reqs.get('industry', 0)}"
+            )
 
             include_links = st.toggle(
                 "LLM prompt'a linkleri dahil et",
@@ -281,6 +437,7 @@ with tabs[2]:
                 include_url=include_links,
                 max_items=10,
                 max_snippet_chars=500,
+                near_dupe=True,
             )
 
             with st.expander("LLM için ham bağlamı göster", expanded=False):
@@ -301,14 +458,47 @@ with tabs[2]:
     else:
         st.info("Gerçek haberleri görmek için toggle'ı aç.")
 
-with tabs[3]:
+elif section == "Raporlar":
     st.header("Rapor Yönetimi")
 
     st.write("Kayıtlı e-posta:")
     st.write(saved_email if saved_email else "Kayıtlı e-posta yok.")
 
-    if st.button("Test Raporu Gönder"):
-        st.success("Test raporu gönderildi (sahte).")
+    if saved_email:
+        import pandas as pd
+
+        subscribers = subscriber_store()
+        cadence_labels = {"Günlük": "daily", "Haftalık": "weekly"}
+        cadence = st.selectbox("Rapor sıklığı", list(cadence_labels), key="report_cadence")
+
+        c1, c2 = st.columns(2)
+        if c1.button(f"{selected_ticker} raporuna abone ol"):
+            subscribers.subscribe(saved_email, selected_ticker, cadence_labels[cadence])
+            st.success(f"{selected_ticker} için {cadence.lower()} rapor planlandı.")
+        if c2.button("Test Raporu Gönder"):
+            try:
+                with st.spinner("Rapor hazırlanıyor ve gönderiliyor..."):
+                    from src.reports.scheduler import send_test_report
+
+                    send_test_report(saved_email, selected_ticker, selected_label)
+                st.success("Test raporu gönderildi.")
+            except Exception as e:
+                st.error(f"Rapor gönderilemedi: {e}")
+
+        subs = subscribers.for_email(saved_email)
+        if subs:
+            st.write("Abonelikler:")
+            names = {v: k for k, v in cadence_labels.items()}
+            for sub in subs:
+                sent = sub["last_sent_at"]
+                last = pd.Timestamp(sent, unit="s").strftime("%Y-%m-%d %H:%M") if sent else "henüz gönderilmedi"
+                a, b = st.columns([4, 1])
+                a.write(f"{sub['ticker']} — {names.get(sub['cadence'], sub['cadence'])} (son gönderim: {last})")
+                if b.button("Kaldır", key=f"unsub_{sub['ticker']}"):
+                    subscribers.unsubscribe(saved_email, sub["ticker"])
+                    st.rerun()
+    else:
+        st.info("Rapor planlamak için soldan e-postanızı kaydedin.")
 
-    st.write("Rapor planla (sahte):")
-    st.date_input("Rapor Tarihi")
+with diagnostics_panel:
+    render_marketaux_diagnostics()
@@ -0,0 +1,180 @@
+"""
+Haber yolu için uçtan uca gecikme benchmark'ı (yerel mock Marketaux sunucusu üzerinde).
+
+Her senaryo cold (boş entity/haber deposu ve boş bağlam memo'ları) ve warm (aynı depo/memo, ikinci tur)
+olarak ölçülür: çağrı başına istek sayısı, p50/p95 gecikme, throughput, tepe bellek ve news_prompt
+memo'larının (bağlam / makale bloğu) hit-miss sayıları.
+
+    python -m bench.bench_news --iterations 10 --latency-ms 80
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+from bench.mock_marketaux import MockConfig, start_in_thread
+
+
+def _percentile(xs: List[float], q: float) -> float:
+    if not xs:
+        return 0.0
+    xs = sorted(xs)
+    k = (len(xs) - 1) * q
+    lo, hi = int(k), min(int(k) + 1, len(xs) - 1)
+    return xs[lo] + (xs[hi] - xs[lo]) * (k - lo)
+
+
+def _memo_counts() -> Dict[str, int]:
+    from src.reports.news_prompt import context_cache_info
+
+    info = context_cache_info()
+    return {
+        "ctx_hit": info["contexts"]["hits"],
+        "ctx_miss": info["contexts"]["misses"],
+        "item_hit": info["items"]["hits"],
+        "item_miss": info["items"]["misses"],
+    }
+
+
+def _measure(fn: Callable[[], Any], iterations: int, reset: Callable[[], None]) -> Dict[str, float]:
+    from src.integrations import marketaux
+
+    latencies: List[float] = []
+    requests_made = 0
+    peak = 0
+    memo = dict.fromkeys(_memo_counts(), 0)
+    for _ in range(iterations):
+        reset()
+        marketaux.reset_metrics()
+        # cold reset memo'ları yeniden oluşturur: sayaçları her turda reset sonrası farkla topla
+        before = _memo_counts()
+        tracemalloc.start()
+        t0 = time.perf_counter()
+        fn()
+        latencies.append((time.perf_counter() - t0) * 1000)
+        peak = max(peak, tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+        requests_made += marketaux.get_metrics()["requests"]
+        after = _memo_counts()
+        for k in memo:
+            memo[k] += after[k] - before[k]
+
+    total_s = sum(latencies) / 1000
+    return {
+        "req/call": requests_made / iterations,
+        "p50_ms": _percentile(latencies, 0.50),
+        "p95_ms": _percentile(latencies, 0.95),
+        "calls/s": iterations / total_s if total_s else 0.0,
+        "peak_kb": peak / 1024,
+        **memo,
+    }
+
+
+def run(iterations: int, config: MockConfig, ticker: str = "KO", label: str = "Coca-Cola") -> List[Dict[str, Any]]:
+    server, base_url = start_in_thread(config)
+    os.environ["MARKETAUX_BASE_URL"] = base_url
+    os.environ.setdefault("MARKETAUX_API_TOKEN", "bench")
+
+    workdir = Path(tempfile.mkdtemp(prefix="finanalytics-bench-"))
+    os.chdir(workdir)
+
+    # BASE ve store yolları import anında okunur: ortam ayarlandıktan sonra içe aktar
+    from src.integrations import marketaux
+    from src.integrations.entity_store import SQLiteEntityStore, set_entity_store
+    from src.integrations.news_store import NewsStore, set_news_store
+    from src.reports.news_prompt import build_llm_context, configure_context_cache
+
+    counter = {"i": 0}
+
+    def fresh_stores() -> None:
+        counter["i"] += 1
+        d = workdir / f"cold-{counter['i']}"
+        d.mkdir()
+        set_entity_store(SQLiteEntityStore(d / "entities.sqlite3"))
+        set_news_store(NewsStore(d / "news.sqlite3"))
+        # bağlam/makale memo'ları da boşalır: aksi halde cold bağlam ölçümü memo isabeti olur
+        configure_context_cache()
+
+    def keep_stores() -> None:
+        pass
+
+    def _news() -> Dict[str, Any]:
+        return marketaux.get_ticker_and_industry_news(ticker, company_name=label, n=10)
+
+    cached: Dict[str, Any] = {}
+
+    def _context() -> Any:
+        res = cached["res"]
+        return build_llm_context(
+            symbol=res["symbol"],
+            industry=res["industry"],
+            ticker_news=res["ticker_news"],
+            industry_news=res["industry_news"],
+        )
+
+    scenarios = {
+        "resolve_entity": lambda: marketaux.resolve_entity(ticker, company_name=label),
+        "get_last_n_news": lambda: marketaux.get_last_n_news("symbols", ticker, n=10),
+        "get_ticker_and_industry_news": _news,
+        "build_llm_context": _context,
+    }
+
+    rows = []
+    for name, fn in scenarios.items():
+        if name == "build_llm_context":
+            # sadece bağlam üretimini ölç: haberler önceden çekilir
+            cached["res"] = _news()
+        cold = _measure(fn, iterations, fresh_stores)
+        warm = _measure(fn, iterations, keep_stores)
+        rows.append({"scenario": name, "mode": "cold", **cold})
+        rows.append({"scenario": name, "mode": "warm", **warm})
+
+    server.shutdown()
+    return rows
+
+
+def _print_table(rows: List[Dict[str, Any]]) -> None:
+    cols = [
+        "scenario",
+        "mode",
+        "req/call",
+        "p50_ms",
+        "p95_ms",
+        "calls/s",
+        "peak_kb",
+        "ctx_hit",
+        "ctx_miss",
+        "item_hit",
+        "item_miss",
+    ]
+    print("  ".join(f"{c:>28}" if i == 0 else f"{c:>10}" for i, c in enumerate(cols)))
+    for r in rows:
+        cells = []
+        for i, c in enumerate(cols):
+            v = r[c]
+            cells.append(f"{v:>28}" if i == 0 else (f"{v:>10.2f}" if isinstance(v, float) else f"{v:>10}"))
+        print("  ".join(cells))
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Marketaux haber yolu benchmark'ı")
+    parser.add_argument("--iterations", type=int, default=10)
+    parser.add_argument("--latency-ms", type=float, default=50.0)
+    parser.add_argument("--jitter-ms", type=float, default=10.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--ticker", default="KO")
+    parser.add_argument("--label", default="Coca-Cola")
+    args = parser.parse_args()
+
+    cfg = MockConfig(latency_ms=args.latency_ms, jitter_ms=args.jitter_ms, error_rate=args.error_rate)
+    _print_table(run(args.iterations, cfg, ticker=args.ticker, label=args.label))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
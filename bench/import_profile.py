@@ -0,0 +1,117 @@
+"""
+Import süresi profili (`python -X importtime` üzerinden).
+
+Varsayılan olarak app/App.py'nin modül seviyesindeki importlarını (dashboard'un ilk boyamadan önce
+ödediği bedel) ve bölümlerde (sadece seçili bölüm çalışır) tembel yüklenen modülleri ayrı ayrı, temiz bir yorumlayıcıda ölçer.
+
+    python -m bench.import_profile
+    python -m bench.import_profile pandas src.integrations.marketaux --top 15
+"""
+
+import argparse
+import ast
+import re
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+
+APP = Path(__file__).resolve().parent.parent / "app" / "App.py"
+_LINE_RE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def app_imports(path: Path = APP) -> Tuple[List[str], List[str]]:
+    """(modül seviyesinde importlar, fonksiyon içinde tembel importlar)"""
+    tree = ast.parse(path.read_text(encoding="utf-8"))
+    top = {id(n) for n in tree.body}
+    eager, lazy = [], []
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            names = [a.name for a in node.names]
+        elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+            names = [node.module]
+        else:
+            continue
+        (eager if id(node) in top else lazy).extend(names)
+    eager = list(dict.fromkeys(eager))
+    return eager, [m for m in dict.fromkeys(lazy) if m not in eager]
+
+
+def profile(modules: List[str]) -> Dict[str, object]:
+    """
+    Modülleri temiz bir süreçte içe aktarır; toplam süre ve modül başına kümülatif süreler.
+    Yorumlayıcı açılışında zaten yüklenen modüller (site, encodings, ...) üst seviye listesinden çıkarılır.
+    """
+    # kurulu olmayan modüller (ör. streamlit olmayan bir CI ortamı) atlanır ve ayrıca raporlanır
+    code = "import sys\n" + "".join(
+        f"try:\n    import {m}\nexcept ImportError:\n    print('missing: {m}', file=sys.stderr)\n" for m in modules
+    )
+    t0 = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True,
+        text=True,
+        cwd=str(APP.parent.parent),
+    )
+    wall = time.perf_counter() - t0
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1])
+
+    rows, missing = [], []
+    for line in proc.stderr.splitlines():
+        if line.startswith("missing: "):
+            missing.append(line[len("missing: ") :])
+        m = _LINE_RE.match(line)
+        if m:
+            depth = (len(m.group(3)) - 1) // 2
+            rows.append({"module": m.group(4), "self_ms": int(m.group(1)) / 1000, "cum_ms": int(m.group(2)) / 1000, "depth": depth})
+    startup = _startup_modules() if modules else set()
+    top_level = [r for r in rows if r["depth"] == 0 and r["module"] not in startup]
+    return {
+        "wall_s": wall,
+        "modules": len(rows),
+        "import_ms": sum(r["cum_ms"] for r in top_level),
+        "top": top_level,
+        "missing": missing,
+    }
+
+
+_startup: Optional[Set[str]] = None
+
+
+def _startup_modules() -> Set[str]:
+    global _startup
+    if _startup is None:
+        _startup = {r["module"] for r in profile([])["top"]}  # type: ignore[union-attr]
+    return _startup
+
+
+def _report(title: str, modules: List[str], top: int) -> None:
+    res = profile(modules)
+    print(f"== {title}: {len(modules)} import, {res['modules']} modül yüklendi")
+    print(f"   import süresi {res['import_ms']:.0f} ms, süreç toplamı {res['wall_s'] * 1000:.0f} ms")
+    for r in sorted(res["top"], key=lambda r: -r["cum_ms"])[:top]:
+        print(f"   {r['cum_ms']:>9.1f} ms  {r['module']}")
+    if res["missing"]:
+        print(f"   kurulu değil (atlandı): {', '.join(res['missing'])}")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Import süresi profili (-X importtime)")
+    parser.add_argument("modules", nargs="*", help="Varsayılan: app/App.py importları")
+    parser.add_argument("--top", type=int, default=10, help="Gösterilecek en pahalı üst seviye import sayısı")
+    args = parser.parse_args()
+
+    if args.modules:
+        _report("seçilen modüller", args.modules, args.top)
+        return 0
+
+    eager, lazy = app_imports()
+    _report("App.py ilk boyama (modül seviyesi)", eager, args.top)
+    _report("App.py tembel (bölüm/işlem başına)", lazy, args.top)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
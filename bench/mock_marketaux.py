@@ -0,0 +1,190 @@
+"""
+Yerel Marketaux stand-in sunucusu: /entity/search ve /news/all.
+
+Gecikme, hata oranı ve haber havuzu büyüklüğü ayarlanabilir; yanıtlar gerçek API ile aynı
+`data` + `meta` (found/returned/limit/page) şeklindedir.
+
+    python -m bench.mock_marketaux --port 8765 --latency-ms 80 --error-rate 0.02
+    MARKETAUX_BASE_URL=http://127.0.0.1:8765/v1 MARKETAUX_API_TOKEN=x poetry run streamlit run app/App.py
+"""
+
+import argparse
+import hashlib
+import json
+import random
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+from src.universe import TICKERS
+
+TECH = {"AAPL", "MSFT", "NVDA"}
+
+
+class MockConfig:
+    def __init__(
+        self,
+        *,
+        latency_ms: float = 50.0,
+        jitter_ms: float = 10.0,
+        error_rate: float = 0.0,
+        articles_per_stream: int = 60,
+        entity_page_limit: int = 50,
+        max_news_limit: int = 50,
+        seed: int = 7,
+    ) -> None:
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.articles_per_stream = articles_per_stream
+        self.entity_page_limit = entity_page_limit
+        self.max_news_limit = max_news_limit
+        self.seed = seed
+
+
+def _entities() -> List[Dict[str, Any]]:
+    out = []
+    for label, ticker in TICKERS.items():
+        symbol = ticker.replace(".", "-")
+        industry = "Technology" if ticker in TECH else "Consumer Defensive"
+        out.append({"symbol": symbol, "name": label, "industry": industry, "country": "us", "type": "equity"})
+    return out
+
+
+def _article(stream: str, i: int, base: datetime) -> Dict[str, Any]:
+    uid = hashlib.md5(f"{stream}:{i}".encode()).hexdigest()
+    published = base - timedelta(minutes=37 * i)
+    return {
+        "uuid": uid,
+        "title": f"{stream} haber {i}: piyasa güncellemesi",
+        "description": f"{stream} için örnek açıklama metni {i}. " * 4,
+        "snippet": f"{stream} snippet {i}",
+        "url": f"https://news.example.com/{uid}",
+        "source": random.Random(i).choice(["reuters.com", "bloomberg.com", "wsj.com", "ft.com"]),
+        "published_at": published.strftime("%Y-%m-%dT%H:%M:%S.000000Z"),
+        "entities": [],
+    }
+
+
+class MockMarketaux:
+    def __init__(self, config: Optional[MockConfig] = None) -> None:
+        self.config = config or MockConfig()
+        self.entities = _entities()
+        self.base_time = datetime.now(timezone.utc).replace(microsecond=0)
+        self.counts: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._rng = random.Random(self.config.seed)
+
+    def _count(self, path: str) -> None:
+        with self._lock:
+            self.counts[path] = self.counts.get(path, 0) + 1
+
+    def entity_search(self, q: Dict[str, str]) -> Dict[str, Any]:
+        cands = self.entities
+        if q.get("symbols"):
+            wanted = {s.strip().upper() for s in q["symbols"].split(",")}
+            cands = [e for e in cands if e["symbol"] in wanted]
+        if q.get("search"):
+            needle = q["search"].lower()
+            cands = [e for e in cands if needle in e["name"].lower() or needle == e["symbol"].lower()]
+        if q.get("countries"):
+            allowed = {c.strip().lower() for c in q["countries"].split(",")}
+            cands = [e for e in cands if e["country"] in allowed]
+        return self._paginate(cands, self.config.entity_page_limit, int(q.get("page", 1)))
+
+    def news_all(self, q: Dict[str, str]) -> Dict[str, Any]:
+        stream = q.get("symbols") or q.get("industries") or "all"
+        pool = [_article(stream, i, self.base_time) for i in range(self.config.articles_per_stream)]
+        if q.get("published_after"):
+            pool = [a for a in pool if a["published_at"][:19] >= q["published_after"][:19]]
+        limit = min(int(q.get("limit", 3)), self.config.max_news_limit)
+        return self._paginate(pool, limit, int(q.get("page", 1)))
+
+    @staticmethod
+    def _paginate(items: List[Dict[str, Any]], limit: int, page: int) -> Dict[str, Any]:
+        chunk = items[(page - 1) * limit : page * limit]
+        return {"meta": {"found": len(items), "returned": len(chunk), "limit": limit, "page": page}, "data": chunk}
+
+    def handle(self, path: str, q: Dict[str, str]) -> Tuple[int, Dict[str, Any]]:
+        cfg = self.config
+        delay = max(0.0, cfg.latency_ms + self._rng.uniform(-cfg.jitter_ms, cfg.jitter_ms)) / 1000
+        time.sleep(delay)
+
+        if path.endswith("/__stats"):
+            return 200, {"counts": dict(self.counts)}
+
+        self._count(path)
+        if not q.get("api_token"):
+            return 401, {"error": {"code": "invalid_api_token"}}
+        if cfg.error_rate and self._rng.random() < cfg.error_rate:
+            return self._rng.choice([429, 500, 503]), {"error": {"code": "mock_error"}}
+        if path.endswith("/entity/search"):
+            return 200, self.entity_search(q)
+        if path.endswith("/news/all"):
+            return 200, self.news_all(q)
+        return 404, {"error": {"code": "not_found"}}
+
+
+def make_server(host: str = "127.0.0.1", port: int = 0, config: Optional[MockConfig] = None) -> ThreadingHTTPServer:
+    mock = MockMarketaux(config)
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self) -> None:
+            url = urlparse(self.path)
+            q = {k: v[-1] for k, v in parse_qs(url.query).items()}
+            status, body = mock.handle(url.path, q)
+            raw = json.dumps(body).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(raw)))
+            total = sum(mock.counts.values())
+            self.send_header("X-UsageLimit-Limit", "100000")
+            self.send_header("X-UsageLimit-Remaining", str(max(0, 100000 - total)))
+            self.end_headers()
+            self.wfile.write(raw)
+
+        def log_message(self, format: str, *args: Any) -> None:
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    server.mock = mock  # type: ignore[attr-defined]
+    return server
+
+
+def start_in_thread(config: Optional[MockConfig] = None) -> Tuple[ThreadingHTTPServer, str]:
+    server = make_server(config=config)
+    threading.Thread(target=server.serve_forever, name="mock-marketaux", daemon=True).start()
+    host, port = server.server_address[:2]
+    return server, f"http://{host}:{port}/v1"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Yerel Marketaux stand-in sunucusu")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=float, default=50.0)
+    parser.add_argument("--jitter-ms", type=float, default=10.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--articles", type=int, default=60, help="Akış başına haber sayısı")
+    args = parser.parse_args()
+
+    cfg = MockConfig(
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate,
+        articles_per_stream=args.articles,
+    )
+    server = make_server(args.host, args.port, cfg)
+    print(f"Mock Marketaux: http://{args.host}:{args.port}/v1")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
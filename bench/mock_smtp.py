@@ -0,0 +1,123 @@
+"""
+Yerel SMTP stand-in sunucusu: gelen mesajları bellekte tutar (isteğe bağlı olarak diske yazar).
+
+Python 3.12'de smtpd kaldırıldığı için HELO/EHLO, MAIL, RCPT, DATA, RSET, NOOP ve QUIT komutlarını
+destekleyen minimal bir sunucudur; rapor gönderim hattını gerçek sunucu olmadan denemek içindir.
+
+    python -m bench.mock_smtp --port 8025 --latency-ms 20
+    SMTP_HOST=127.0.0.1 SMTP_PORT=8025 python -m src.reports.scheduler run
+"""
+
+import argparse
+import socketserver
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+
+class MockSmtpConfig:
+    def __init__(self, *, latency_ms: float = 0.0, outdir: Optional[Path] = None) -> None:
+        self.latency_ms = latency_ms
+        self.outdir = Path(outdir) if outdir else None
+
+
+class MailSink:
+    def __init__(self, config: Optional[MockSmtpConfig] = None) -> None:
+        self.config = config or MockSmtpConfig()
+        self.messages: List[Dict[str, Any]] = []
+        self.connections = 0
+        self._lock = threading.Lock()
+
+    def accept(self, sender: str, rcpts: List[str], data: bytes) -> None:
+        with self._lock:
+            self.messages.append({"from": sender, "to": rcpts, "data": data})
+            n = len(self.messages)
+        if self.config.outdir:
+            self.config.outdir.mkdir(parents=True, exist_ok=True)
+            (self.config.outdir / f"{n:06d}.eml").write_bytes(data)
+
+
+def make_server(
+    host: str = "127.0.0.1", port: int = 0, config: Optional[MockSmtpConfig] = None
+) -> socketserver.ThreadingTCPServer:
+    sink = MailSink(config)
+
+    class Handler(socketserver.StreamRequestHandler):
+        def _reply(self, line: str) -> None:
+            self.wfile.write(f"{line}\r\n".encode("ascii"))
+
+        def handle(self) -> None:
+            with sink._lock:
+                sink.connections += 1
+            self._reply("220 mock-smtp ready")
+            sender, rcpts = "", []
+            while True:
+                raw = self.rfile.readline()
+                if not raw:
+                    return
+                cmd = raw.decode("utf-8", "replace").strip()
+                verb = cmd.split(" ", 1)[0].upper()
+                if verb == "EHLO":
+                    self.wfile.write(b"250-mock-smtp\r\n250-8BITMIME\r\n250 SMTPUTF8\r\n")
+                elif verb == "HELO":
+                    self._reply("250 mock-smtp")
+                elif verb == "MAIL":
+                    sender, rcpts = cmd.split(":", 1)[-1].strip().split(" ")[0].strip("<>"), []
+                    self._reply("250 OK")
+                elif verb == "RCPT":
+                    rcpts.append(cmd.split(":", 1)[-1].strip().strip("<>"))
+                    self._reply("250 OK")
+                elif verb == "DATA":
+                    self._reply("354 End data with <CR><LF>.<CR><LF>")
+                    lines = []
+                    while True:
+                        line = self.rfile.readline()
+                        if not line or line in (b".\r\n", b".\n"):
+                            break
+                        lines.append(line[1:] if line.startswith(b"..") else line)
+                    if sink.config.latency_ms:
+                        time.sleep(sink.config.latency_ms / 1000)
+                    sink.accept(sender, rcpts, b"".join(lines))
+                    self._reply("250 OK queued")
+                elif verb in ("RSET", "NOOP"):
+                    if verb == "RSET":
+                        sender, rcpts = "", []
+                    self._reply("250 OK")
+                elif verb == "QUIT":
+                    self._reply("221 Bye")
+                    return
+                else:
+                    self._reply("502 Command not implemented")
+
+    server = socketserver.ThreadingTCPServer((host, port), Handler)
+    server.daemon_threads = True
+    server.sink = sink  # type: ignore[attr-defined]
+    return server
+
+
+def start_in_thread(config: Optional[MockSmtpConfig] = None) -> Tuple[socketserver.ThreadingTCPServer, int]:
+    server = make_server(config=config)
+    threading.Thread(target=server.serve_forever, name="mock-smtp", daemon=True).start()
+    return server, server.server_address[1]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Yerel SMTP stand-in sunucusu")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8025)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="DATA başına yapay gecikme")
+    parser.add_argument("--outdir", default=None, help="Mesajları .eml olarak bu dizine yaz")
+    args = parser.parse_args()
+
+    server = make_server(args.host, args.port, MockSmtpConfig(latency_ms=args.latency_ms, outdir=args.outdir))
+    print(f"Mock SMTP: {args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.shutdown()
+        print(f"{len(server.sink.messages)} mesaj alındı")  # type: ignore[attr-defined]
+
+
+if __name__ == "__main__":
+    main()
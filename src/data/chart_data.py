@@ -0,0 +1,105 @@
+import os
+from functools import lru_cache
+from typing import Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from src.data.price_store import PriceStore, get_price_store
+
+# tarayıcıya giden nokta sayısı ekran genişliğiyle sınırlı: piksel başına birden fazla nokta çizilemez
+CHART_WIDTH_PX = int(os.getenv("CHART_WIDTH_PX", "1200"))
+CHART_CACHE_SIZE = int(os.getenv("CHART_CACHE_SIZE", "256"))
+DOWNSAMPLE_METHODS = ("lttb", "minmax")
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """
+    Largest-Triangle-Three-Buckets: ilk/son nokta korunur, aradaki her kovadan bir önceki seçili nokta ve
+    sonraki kovanın ortalamasıyla en büyük üçgeni kuran nokta seçilir. Kova içi hesap vektörel,
+    döngü sadece çıktı noktası sayısı kadar.
+    """
+    n = len(y)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    x = np.asarray(x, dtype="float64")
+    y = np.asarray(y, dtype="float64")
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    nxt = np.append(edges[1:], n)
+
+    out = np.empty(n_out, dtype=np.int64)
+    out[0], out[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        avg_x = x[hi : nxt[i + 1]].mean()
+        avg_y = y[hi : nxt[i + 1]].mean()
+        area = np.abs((x[a] - avg_x) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (avg_y - y[a]))
+        a = lo + int(np.argmax(area))
+        out[i + 1] = a
+    return out
+
+
+def minmax_indices(y: np.ndarray, n_out: int) -> np.ndarray:
+    """Kova başına min ve max noktası (tepe/dipler kaybolmaz); tamamen vektörel."""
+    n = len(y)
+    if n_out >= n or n_out < 4:
+        return np.arange(n)
+    y = np.asarray(y, dtype="float64")
+    buckets = (n_out - 2) // 2
+    edges = np.linspace(1, n - 1, buckets + 1).astype(np.int64)
+    width = int(np.diff(edges).max())
+    idx = edges[:-1, None] + np.arange(width)
+    valid = idx < edges[1:, None]
+    vals = y[np.minimum(idx, n - 1)]
+    rows = np.arange(buckets)
+    imin = idx[rows, np.where(valid, vals, np.inf).argmin(axis=1)]
+    imax = idx[rows, np.where(valid, vals, -np.inf).argmax(axis=1)]
+    return np.unique(np.concatenate([[0, n - 1], imin, imax]))
+
+
+def downsample(index: pd.DatetimeIndex, values: np.ndarray, n_out: int, method: str = "lttb") -> pd.Series:
+    if method not in DOWNSAMPLE_METHODS:
+        raise ValueError(f"Bilinmeyen örnekleme yöntemi: {method}")
+    values = np.asarray(values, dtype="float64")
+    ok = ~np.isnan(values)
+    if not ok.all():
+        index, values = index[ok], values[ok]
+    if method == "lttb":
+        keep = lttb_indices(index.asi8, values, n_out)
+    else:
+        keep = minmax_indices(values, n_out)
+    return pd.Series(values[keep], index=index[keep])
+
+
+@lru_cache(maxsize=CHART_CACHE_SIZE)
+def _cached_series(
+    ticker: str, start: Optional[str], end: Optional[str], points: int, method: str, version: str, root: str
+) -> pd.Series:
+    bars = PriceStore(root).load(ticker, start=start, end=end)
+    return downsample(bars.index, bars["close"].to_numpy(), points, method)
+
+
+def chart_series(
+    ticker: str,
+    *,
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+    points: int = CHART_WIDTH_PX,
+    method: str = "lttb",
+    store: Optional[PriceStore] = None,
+) -> pd.Series:
+    """
+    Kapanış serisinin en fazla `points` noktaya indirgenmiş hali. Sonuç (ticker, aralık, çözünürlük,
+    yöntem) ile önbelleğe alınır; depoya yeni bar eklenince son tarih değiştiği için anahtar da değişir.
+    """
+    store = store or get_price_store()
+    last = store.last_date(ticker)
+    if last is None:
+        return pd.Series(dtype="float64")
+    return _cached_series(ticker, start, end, points, method, str(last), str(store.root))
+
+
+def chart_cache_info() -> Tuple[int, int, int]:
+    info = _cached_series.cache_info()
+    return info.hits, info.misses, info.currsize
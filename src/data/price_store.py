@@ -0,0 +1,149 @@
+import argparse
+import fcntl
+import os
+import re
+import sys
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator, List, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+PRICE_STORE_DIR = Path(os.getenv("PRICE_STORE_DIR", ".cache/prices"))
+OHLCV_COLUMNS = ["open", "high", "low", "close", "volume"]
+
+DateLike = Union[str, pd.Timestamp, np.datetime64, None]
+
+
+def _safe(ticker: str) -> str:
+    return re.sub(r"[^A-Za-z0-9]+", "_", ticker.strip().upper()).strip("_")
+
+
+class PriceStore:
+    """
+    Ticker başına sütunsal, append-only OHLCV deposu.
+      <root>/<TICKER>/dates.i8  : int64 (datetime64[ns]) artan tarih dizisi
+      <root>/<TICKER>/ohlcv.f8  : float64, (N, 5) satır-öncelikli open/high/low/close/volume
+    Okumalar np.memmap üzerinden yapılır: tarih aralığı searchsorted ile bulunur, sadece
+    o dilim diskten sayfalanır ve DataFrame değerleri kopyalanmadan memmap'e bakar.
+    """
+
+    def __init__(self, root: Path = PRICE_STORE_DIR) -> None:
+        self.root = Path(root)
+
+    def _dir(self, ticker: str) -> Path:
+        return self.root / _safe(ticker)
+
+    @contextmanager
+    def _locked(self, ticker: str) -> Iterator[Path]:
+        d = self._dir(ticker)
+        d.mkdir(parents=True, exist_ok=True)
+        with open(d / ".lock", "w") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                yield d
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def _maps(self, ticker: str) -> Tuple[np.ndarray, np.ndarray]:
+        d = self._dir(ticker)
+        dpath, vpath = d / "dates.i8", d / "ohlcv.f8"
+        if not dpath.exists() or not vpath.exists():
+            return np.empty(0, dtype="datetime64[ns]"), np.empty((0, len(OHLCV_COLUMNS)))
+
+        # yarım kalmış bir append'e karşı: iki dosyadan kısa olanı kadar satır geçerli
+        n = min(dpath.stat().st_size // 8, vpath.stat().st_size // (8 * len(OHLCV_COLUMNS)))
+        if n == 0:
+            return np.empty(0, dtype="datetime64[ns]"), np.empty((0, len(OHLCV_COLUMNS)))
+        dates = np.memmap(dpath, dtype="datetime64[ns]", mode="r", shape=(n,))
+        values = np.memmap(vpath, dtype="float64", mode="r", shape=(n, len(OHLCV_COLUMNS)))
+        return dates, values
+
+    def tickers(self) -> List[str]:
+        if not self.root.exists():
+            return []
+        return sorted(p.name for p in self.root.iterdir() if (p / "dates.i8").exists())
+
+    def last_date(self, ticker: str) -> Optional[pd.Timestamp]:
+        dates, _ = self._maps(ticker)
+        return pd.Timestamp(dates[-1]) if len(dates) else None
+
+    def append(self, ticker: str, df: pd.DataFrame) -> int:
+        """
+        Yeni barları ekler. df: DatetimeIndex (veya "date" kolonu) + OHLCV_COLUMNS.
+        Sadece depodaki son tarihten sonraki satırlar yazılır; eklenen satır sayısı döner.
+        """
+        if "date" in df.columns:
+            df = df.set_index("date")
+        df = df.rename(columns=str.lower)
+        missing = [c for c in OHLCV_COLUMNS if c not in df.columns]
+        if missing:
+            raise ValueError(f"Eksik OHLCV kolonları: {missing}")
+
+        idx = pd.DatetimeIndex(pd.to_datetime(df.index))
+        if idx.tz is not None:
+            idx = idx.tz_convert(None)
+        frame = df[OHLCV_COLUMNS].astype("float64").set_axis(idx).sort_index()
+        frame = frame[~frame.index.duplicated(keep="last")]
+
+        with self._locked(ticker) as d:
+            last = self.last_date(ticker)
+            if last is not None:
+                frame = frame[frame.index > last]
+            if frame.empty:
+                return 0
+
+            dates = frame.index.values.astype("datetime64[ns]").view("int64")
+            values = np.ascontiguousarray(frame.to_numpy(dtype="float64"))
+            # önce değerler, sonra tarihler: okuyucu tarih sayısına göre satır görür
+            with open(d / "ohlcv.f8", "ab") as f:
+                f.write(values.tobytes())
+            with open(d / "dates.i8", "ab") as f:
+                f.write(dates.tobytes())
+        return len(frame)
+
+    def load(self, ticker: str, start: DateLike = None, end: DateLike = None) -> pd.DataFrame:
+        """[start, end] aralığındaki barları DatetimeIndex'li DataFrame olarak döndürür (kopyasız)."""
+        dates, values = self._maps(ticker)
+        lo = 0 if start is None else int(np.searchsorted(dates, np.datetime64(pd.Timestamp(start)), side="left"))
+        hi = len(dates) if end is None else int(np.searchsorted(dates, np.datetime64(pd.Timestamp(end)), side="right"))
+        index = pd.DatetimeIndex(np.asarray(dates[lo:hi]), name="date")
+        return pd.DataFrame(values[lo:hi], index=index, columns=OHLCV_COLUMNS, copy=False)
+
+    def import_csv(self, ticker: str, path: Union[str, Path]) -> int:
+        df = pd.read_csv(path)
+        df.columns = [c.strip().lower().replace("adj close", "adj_close") for c in df.columns]
+        return self.append(ticker, df)
+
+
+_store_obj: Optional[PriceStore] = None
+
+
+def get_price_store() -> PriceStore:
+    global _store_obj
+    if _store_obj is None:
+        _store_obj = PriceStore()
+    return _store_obj
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Yerel OHLCV fiyat deposu")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    imp = sub.add_parser("import", help="CSV'den (date,open,high,low,close,volume) artımlı içe aktar")
+    imp.add_argument("ticker")
+    imp.add_argument("csv")
+    sub.add_parser("list", help="Depodaki ticker'lar ve son tarihleri")
+    args = parser.parse_args()
+
+    store = get_price_store()
+    if args.cmd == "import":
+        print(f"{args.ticker}: {store.import_csv(args.ticker, args.csv)} yeni bar")
+    else:
+        for t in store.tickers():
+            print(t, store.last_date(t))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
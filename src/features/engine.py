@@ -0,0 +1,107 @@
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from src.data.price_store import DateLike, PriceStore, get_price_store
+
+# işlem günü cinsinden kısa/orta/uzun vade pencereleri
+HORIZONS: Dict[str, int] = {"short": 5, "mid": 21, "long": 63}
+TRADING_DAYS = 252
+FEATURES = ["ret", "vol", "drawdown", "momentum", "zscore"]
+
+
+def load_panel(
+    tickers: Iterable[str],
+    *,
+    start: DateLike = None,
+    end: DateLike = None,
+    field: str = "close",
+    store: Optional[PriceStore] = None,
+) -> pd.DataFrame:
+    """Fiyat deposundan tarih × ticker paneli kurar (tarih birleşimi, eksik günler ileri taşınır)."""
+    store = store or get_price_store()
+    cols = {t: store.load(t, start=start, end=end)[field] for t in tickers}
+    cols = {t: s for t, s in cols.items() if len(s)}
+    if not cols:
+        return pd.DataFrame(dtype="float64")
+    return pd.DataFrame(cols).sort_index().ffill()
+
+
+def compute_features(prices: pd.DataFrame, horizons: Optional[Dict[str, int]] = None) -> pd.DataFrame:
+    """
+    Tüm ticker'lar için aynı anda (kolon bazında vektörel) vade özelliklerini hesaplar.
+    Çıktı kolonları: MultiIndex (f"{özellik}_{vade}", ticker). Pencere dolmadan değer NaN'dir.
+      ret      : h günlük log getiri
+      vol      : günlük log getirilerin h günlük yıllıklandırılmış std'si
+      drawdown : fiyatın h günlük zirveye göre düşüşü
+      momentum : fiyatın h günlük ortalamaya göre sapması
+      zscore   : fiyatın h günlük ortalama/std'ye göre z-skoru
+    """
+    horizons = horizons or HORIZONS
+    prices = prices.astype("float64")
+    logp = np.log(prices.where(prices > 0))
+    r1 = logp.diff()
+
+    out: Dict[str, pd.DataFrame] = {}
+    for name, h in horizons.items():
+        roll = prices.rolling(h, min_periods=h)
+        mean = roll.mean()
+        std = roll.std()
+        out[f"ret_{name}"] = logp - logp.shift(h)
+        out[f"vol_{name}"] = r1.rolling(h, min_periods=h).std() * np.sqrt(TRADING_DAYS)
+        out[f"drawdown_{name}"] = prices / roll.max() - 1.0
+        out[f"momentum_{name}"] = prices / mean - 1.0
+        out[f"zscore_{name}"] = (prices - mean) / std.where(std > 0)
+    return pd.concat(out, axis=1)
+
+
+class FeatureEngine:
+    """
+    Panel üzerinde artımlı özellik motoru. İlk kurulumda tüm geçmişi hesaplar; update() ile
+    gelen yeni barlar için sadece en uzun pencere kadar kuyruk + yeni satırlar yeniden hesaplanır.
+    """
+
+    def __init__(self, prices: pd.DataFrame, horizons: Optional[Dict[str, int]] = None) -> None:
+        self.horizons = dict(horizons or HORIZONS)
+        self.lookback = max(self.horizons.values()) + 1
+        self.prices = prices.sort_index()
+        self.features = compute_features(self.prices, self.horizons)
+
+    @classmethod
+    def from_store(
+        cls,
+        tickers: Iterable[str],
+        *,
+        start: DateLike = None,
+        end: DateLike = None,
+        horizons: Optional[Dict[str, int]] = None,
+        store: Optional[PriceStore] = None,
+    ) -> "FeatureEngine":
+        return cls(load_panel(tickers, start=start, end=end, store=store), horizons)
+
+    @property
+    def tickers(self) -> List[str]:
+        return list(self.prices.columns)
+
+    def update(self, new_prices: pd.DataFrame) -> pd.DataFrame:
+        """Son tarihten sonraki barları ekler; sadece yeni satırların özelliklerini döndürür."""
+        new_prices = new_prices.sort_index()
+        if len(self.prices):
+            new_prices = new_prices[new_prices.index > self.prices.index[-1]]
+        if new_prices.empty:
+            return self.features.iloc[0:0]
+
+        tail = self.prices.iloc[-self.lookback :]
+        window = pd.concat([tail, new_prices]).ffill()
+        fresh = compute_features(window, self.horizons).iloc[-len(new_prices) :]
+
+        self.prices = pd.concat([self.prices, window.iloc[-len(new_prices) :]])
+        self.features = pd.concat([self.features, fresh.reindex(columns=self.features.columns)])
+        return fresh
+
+    def latest(self) -> pd.DataFrame:
+        """Son tarihteki özellikler: satır = ticker, kolon = özellik."""
+        if self.features.empty:
+            return pd.DataFrame()
+        return self.features.iloc[-1].unstack(level=1).T
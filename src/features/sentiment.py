@@ -0,0 +1,139 @@
+import argparse
+import hashlib
+import json
+import sys
+import time
+from typing import Dict, Iterable, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from sklearn.feature_extraction.text import CountVectorizer
+
+from src.integrations.news_store import NewsStore, get_news_store
+from src.reports.near_dupe import article_text
+
+# Finans haberleri için küçük ağırlıklı sözlük (Marketaux içeriği İngilizce). İkili ifadeler kendi
+# kelimelerine ek olarak sayılır: "beat expectations" hem ifade hem "beat" olarak puan alır.
+LEXICON: Dict[str, float] = {
+    # olumlu
+    "beat": 1.0, "beats": 1.0, "beat expectations": 1.5, "record": 0.5, "surge": 1.5, "surges": 1.5,
+    "soar": 1.5, "soars": 1.5, "rally": 1.0, "rallies": 1.0, "gain": 0.5, "gains": 0.5, "jump": 1.0,
+    "jumps": 1.0, "rise": 0.5, "rises": 0.5, "growth": 0.5, "upgrade": 1.5, "upgraded": 1.5,
+    "outperform": 1.0, "bullish": 1.5, "strong": 0.5, "profit": 0.5, "raises guidance": 2.0,
+    "raised guidance": 2.0, "buyback": 1.0, "dividend increase": 1.5, "higher": 0.5, "tops": 1.0,
+    "optimistic": 1.0, "recovery": 0.5, "expands": 0.5, "approval": 1.0, "approved": 1.0,
+    # olumsuz
+    "miss": -1.0, "misses": -1.0, "missed expectations": -1.5, "plunge": -1.5, "plunges": -1.5,
+    "slump": -1.5, "slumps": -1.5, "fall": -0.5, "falls": -0.5, "drop": -1.0, "drops": -1.0,
+    "decline": -0.5, "declines": -0.5, "loss": -1.0, "losses": -1.0, "downgrade": -1.5,
+    "downgraded": -1.5, "underperform": -1.0, "bearish": -1.5, "weak": -0.5, "lawsuit": -1.0,
+    "recall": -1.0, "cuts guidance": -2.0, "cut guidance": -2.0, "lowers guidance": -2.0,
+    "layoffs": -1.0, "lower": -0.5, "warning": -1.0, "investigation": -1.0, "fraud": -2.0,
+    "bankruptcy": -2.5, "default": -1.5, "inflation": -0.5, "tariffs": -0.5, "pessimistic": -1.0,
+}
+
+# sözlük değişirse sürüm değişir ve eski skorlar yeniden hesaplanır
+MODEL_VERSION = "lex-" + hashlib.sha1(json.dumps(LEXICON, sort_keys=True).encode()).hexdigest()[:8]
+SCORE_BATCH_SIZE = 2000
+DEFAULT_TEXT_CHARS = 1000
+
+_VOCAB = list(LEXICON)
+_WEIGHTS = np.array([LEXICON[t] for t in _VOCAB], dtype="float64")
+_vectorizer = CountVectorizer(vocabulary=_VOCAB, ngram_range=(1, 2), lowercase=True, token_pattern=r"(?u)\b\w+\b")
+
+
+def score_texts(texts: Iterable[str]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Metin grubunu tek seyrek matris çarpımıyla skorlar.
+      score   : ağırlıklı toplam / (|ağırlık| toplamı + 1), (-1, 1) aralığında
+      density : sözlük eşleşme yoğunluğu, 1 - exp(-isabet/2); finansal sinyal taşımayan metinler ~0.
+                Makalenin ticker'la ilgisi değildir (o, article_keys.relevance: entity match_score'u)
+      hits    : eşleşen terim sayısı
+    """
+    counts = _vectorizer.transform(list(texts))
+    raw = counts @ _WEIGHTS
+    mass = counts @ np.abs(_WEIGHTS)
+    hits = np.asarray(counts.sum(axis=1)).ravel()
+    return raw / (mass + 1.0), 1.0 - np.exp(-hits / 2.0), hits
+
+
+def score_new_articles(store: Optional[NewsStore] = None, *, batch_size: int = SCORE_BATCH_SIZE) -> int:
+    """Depodaki henüz skorlanmamış makaleleri batch'ler halinde skorlar; skorlanan makale sayısı döner."""
+    store = store or get_news_store()
+    total = 0
+    while True:
+        items = [it for it in store.unscored(MODEL_VERSION, batch_size) if it.get("uuid")]
+        if not items:
+            return total
+        score, density, hits = score_texts(article_text(it, DEFAULT_TEXT_CHARS) for it in items)
+        total += store.put_sentiment(zip((it["uuid"] for it in items), score, density, hits), MODEL_VERSION)
+        if len(items) < batch_size:
+            return total
+
+
+def daily_sentiment(kind: str, value: str, *, since: Optional[str] = None, store: Optional[NewsStore] = None) -> pd.DataFrame:
+    """
+    Akışın (kind: "symbols"/"industries") günlük duygu özeti; skorlar depodan okunur, yeniden hesaplanmaz.
+    sentiment_weighted: ilgi × sözlük yoğunluğu ağırlıklı ortalama; ilgi, makalenin bu akışın sembolü/sektörüyle
+    Marketaux entity match_score'una dayanır (yan değinmeler ve sinyal taşımayan metinler ortalamayı sulandırmaz).
+    relevance: günün ortalama ilgisi.
+    """
+    store = store or get_news_store()
+    rows = store.sentiment_daily(kind, value, since)
+    df = pd.DataFrame(rows, columns=["date", "articles", "sentiment", "sentiment_weighted", "relevance"])
+    df["date"] = pd.to_datetime(df["date"])
+    return df.set_index("date")
+
+
+def sentiment_panel(
+    tickers: Iterable[str],
+    *,
+    industries: Optional[Dict[str, str]] = None,
+    index: Optional[pd.DatetimeIndex] = None,
+    since: Optional[str] = None,
+    store: Optional[NewsStore] = None,
+) -> pd.DataFrame:
+    """
+    Model hattı için tarih × ticker duygu paneli. Kolonlar MultiIndex (özellik, ticker):
+      news_sentiment / news_count: ticker akışı, industry_sentiment: ticker'ın sektör akışı.
+    index verilirse (ör. FeatureEngine.prices.index) haber olmayan günler 0 ile doldurulur.
+    """
+    store = store or get_news_store()
+    industries = industries or {}
+    cols: Dict[Tuple[str, str], pd.Series] = {}
+    by_industry: Dict[str, pd.Series] = {}
+    for t in tickers:
+        d = daily_sentiment("symbols", t, since=since, store=store)
+        cols[("news_sentiment", t)] = d["sentiment_weighted"]
+        cols[("news_count", t)] = d["articles"].astype("float64")
+        ind = industries.get(t)
+        if ind:
+            if ind not in by_industry:
+                by_industry[ind] = daily_sentiment("industries", ind, since=since, store=store)["sentiment_weighted"]
+            cols[("industry_sentiment", t)] = by_industry[ind]
+
+    # haber olmayan akışların boş serileri object dtype: fillna'dan önce float64'e çevir
+    panel = pd.DataFrame(cols).astype("float64")
+    if index is not None:
+        panel = panel.reindex(pd.DatetimeIndex(index).normalize())
+        panel.index = index
+    return panel.fillna(0.0)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Haber duygu skorlaması (uuid başına bir kez)")
+    parser.add_argument("--batch-size", type=int, default=SCORE_BATCH_SIZE)
+    parser.add_argument("--show", nargs="*", default=[], help="Günlük özetini yazdırılacak ticker'lar")
+    args = parser.parse_args()
+
+    t0 = time.perf_counter()
+    n = score_new_articles(batch_size=args.batch_size)
+    print(f"{n} makale skorlandı ({MODEL_VERSION}), {time.perf_counter() - t0:.2f} sn")
+    for t in args.show:
+        print(t)
+        print(daily_sentiment("symbols", t.upper()).tail(10).round(3).to_string())
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
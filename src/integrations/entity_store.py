@@ -0,0 +1,242 @@
+import os
+import json
+from abc import ABC, abstractmethod
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+STORE_KIND = os.getenv("MARKETAUX_ENTITY_STORE", "sqlite").strip().lower()
+SQLITE_PATH = Path(os.getenv("MARKETAUX_ENTITY_DB", ".cache/marketaux_entities.sqlite3"))
+JSONL_PATH = Path(os.getenv("MARKETAUX_ENTITY_LOG", ".cache/marketaux_entities.jsonl"))
+LEGACY_JSON_PATH = Path(os.getenv("MARKETAUX_ENTITY_CACHE", ".cache/marketaux_entity_cache.json"))
+
+
+class EntityStore(ABC):
+    """
+    Entity cache backend'leri için ortak arayüz.
+    Okumalar önce process içi memo'dan karşılanır; diske sadece ilk görülen anahtar için gidilir.
+    """
+
+    def __init__(self) -> None:
+        self._memo: Dict[str, Dict[str, Any]] = {}
+        self._miss_memo: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        ent = self._memo.get(key)
+        if ent is not None:
+            return ent
+        ent = self._read(key)
+        if ent is not None:
+            with self._lock:
+                self._memo[key] = ent
+        return ent
+
+    def put(self, key: str, ent: Dict[str, Any]) -> None:
+        self._write(key, ent)
+        with self._lock:
+            self._memo[key] = ent
+
+    def is_miss(self, key: str, *, ttl: float) -> bool:
+        ts = self._miss_memo.get(key)
+        if ts is None:
+            ts = self._read_miss(key)
+            if ts is not None:
+                with self._lock:
+                    self._miss_memo[key] = ts
+        return ts is not None and (time.time() - ts) < ttl
+
+    def put_miss(self, key: str) -> None:
+        ts = time.time()
+        self._write_miss(key, ts)
+        with self._lock:
+            self._miss_memo[key] = ts
+
+    @abstractmethod
+    def items(self) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        ...
+
+    @abstractmethod
+    def _read_miss(self, key: str) -> Optional[float]:
+        ...
+
+    @abstractmethod
+    def _write_miss(self, key: str, ts: float) -> None:
+        ...
+
+    @abstractmethod
+    def _read(self, key: str) -> Optional[Dict[str, Any]]:
+        ...
+
+    @abstractmethod
+    def _write(self, key: str, ent: Dict[str, Any]) -> None:
+        ...
+
+    def _import_legacy(self, path: Path) -> None:
+        # eski tek-dosya JSON cache'i varsa bir kez içeri al
+        if not path.exists():
+            return
+        try:
+            legacy = json.loads(path.read_text(encoding="utf-8")).get("entities", {})
+        except Exception:
+            return
+        for k, v in legacy.items():
+            if isinstance(v, dict) and self._read(k) is None:
+                self._write(k, v)
+
+
+class SQLiteEntityStore(EntityStore):
+    """WAL modunda SQLite: birden fazla Streamlit worker process'i aynı dosyayı güvenle paylaşır."""
+
+    def __init__(self, path: Path = SQLITE_PATH) -> None:
+        super().__init__()
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+
+        conn = self._conn()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("CREATE TABLE IF NOT EXISTS entities (key TEXT PRIMARY KEY, data TEXT NOT NULL)")
+        conn.execute("CREATE TABLE IF NOT EXISTS misses (key TEXT PRIMARY KEY, ts REAL NOT NULL)")
+        conn.commit()
+        if conn.execute("SELECT 1 FROM entities LIMIT 1").fetchone() is None:
+            self._import_legacy(LEGACY_JSON_PATH)
+
+    def _conn(self) -> sqlite3.Connection:
+        # sqlite3 bağlantıları thread'ler arasında paylaşılmaz: thread başına bir bağlantı
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(str(self.path), timeout=30)
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA busy_timeout=30000")
+            self._local.conn = conn
+        return conn
+
+    def _read(self, key: str) -> Optional[Dict[str, Any]]:
+        row = self._conn().execute("SELECT data FROM entities WHERE key = ?", (key,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def _write(self, key: str, ent: Dict[str, Any]) -> None:
+        conn = self._conn()
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO entities (key, data) VALUES (?, ?)",
+                (key, json.dumps(ent, ensure_ascii=False)),
+            )
+
+    def _read_miss(self, key: str) -> Optional[float]:
+        row = self._conn().execute("SELECT ts FROM misses WHERE key = ?", (key,)).fetchone()
+        return float(row[0]) if row else None
+
+    def _write_miss(self, key: str, ts: float) -> None:
+        conn = self._conn()
+        with conn:
+            conn.execute("INSERT OR REPLACE INTO misses (key, ts) VALUES (?, ?)", (key, ts))
+
+    def items(self) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        for key, data in self._conn().execute("SELECT key, data FROM entities"):
+            yield key, json.loads(data)
+
+
+class JsonlEntityStore(EntityStore):
+    """
+    Append-only JSON Lines log + bellek içi indeks.
+    Yazma tek bir O_APPEND write çağrısıdır; diğer process'lerin eklediği satırlar
+    miss durumunda dosyanın kuyruğundan okunur.
+    """
+
+    def __init__(self, path: Path = JSONL_PATH) -> None:
+        super().__init__()
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._index: Dict[str, Dict[str, Any]] = {}
+        self._misses: Dict[str, float] = {}
+        self._offset = 0
+
+        fresh = not self.path.exists()
+        self._refresh()
+        if fresh:
+            self._import_legacy(LEGACY_JSON_PATH)
+
+    def _refresh(self) -> None:
+        if not self.path.exists():
+            return
+        with self.path.open("rb") as f:
+            f.seek(self._offset)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break  # yarım yazılmış satır: bir sonraki okumada tekrar denenecek
+                self._offset += len(line)
+                try:
+                    rec = json.loads(line)
+                    if "miss" in rec:
+                        self._misses[rec["miss"]] = float(rec["ts"])
+                    else:
+                        self._index[rec["key"]] = rec["data"]
+                except Exception:
+                    continue
+
+    def _read(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            if key not in self._index:
+                self._refresh()
+            return self._index.get(key)
+
+    def _append(self, rec: Dict[str, Any]) -> None:
+        line = (json.dumps(rec, ensure_ascii=False) + "\n").encode("utf-8")
+        fd = os.open(str(self.path), os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+        try:
+            os.write(fd, line)
+        finally:
+            os.close(fd)
+
+    def _write(self, key: str, ent: Dict[str, Any]) -> None:
+        self._append({"key": key, "data": ent})
+        with self._lock:
+            self._index[key] = ent
+
+    def _read_miss(self, key: str) -> Optional[float]:
+        with self._lock:
+            if key not in self._misses:
+                self._refresh()
+            return self._misses.get(key)
+
+    def _write_miss(self, key: str, ts: float) -> None:
+        self._append({"miss": key, "ts": ts})
+        with self._lock:
+            self._misses[key] = ts
+
+    def items(self) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        with self._lock:
+            self._refresh()
+            snapshot = list(self._index.items())
+        return iter(snapshot)
+
+
+_BACKENDS = {
+    "sqlite": SQLiteEntityStore,
+    "jsonl": JsonlEntityStore,
+}
+
+_store_obj: Optional[EntityStore] = None
+_store_lock = threading.Lock()
+
+
+def get_entity_store() -> EntityStore:
+    global _store_obj
+    if _store_obj is None:
+        with _store_lock:
+            if _store_obj is None:
+                cls = _BACKENDS.get(STORE_KIND)
+                if cls is None:
+                    raise ValueError(f"Bilinmeyen entity store: {STORE_KIND} (seçenekler: {', '.join(_BACKENDS)})")
+                _store_obj = cls()
+    return _store_obj
+
+
+def set_entity_store(store: Optional[EntityStore]) -> None:
+    global _store_obj
+    with _store_lock:
+        _store_obj = store
@@ -1,12 +1,179 @@
+"""
+Marketaux istemcisinin senkron API'si, ayarları, metrikleri ve saf yardımcıları.
+
+HTTP ve orkestrasyon asyncio çekirdeğindedir (marketaux_async); buradaki public fonksiyonlar onun
+coroutine'lerini paylaşılan arka plan event loop'unda çalıştıran ince sarmalayıcılardır.
+"""
+
+import contextvars
+import logging
 import os
-import json
-from pathlib import Path
-from typing import Any, Dict, List, Optional
+import re
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from src.integrations.news_store import NewsStore, get_news_store
+
+BASE = os.getenv("MARKETAUX_BASE_URL", "https://api.marketaux.com/v1").rstrip("/")
+
+# HTTP transport (marketaux_async): event loop başına keep-alive havuzu + 429/5xx için backoff'lu retry
+POOL_SIZE = int(os.getenv("MARKETAUX_POOL_SIZE", "8"))
+MAX_RETRIES = int(os.getenv("MARKETAUX_MAX_RETRIES", "3"))
+RETRY_BACKOFF = float(os.getenv("MARKETAUX_RETRY_BACKOFF", "0.5"))
+# istek yolunda tek bir beklemenin üst sınırları: üstel backoff ve sunucunun Retry-After başlığı
+RETRY_BACKOFF_MAX = float(os.getenv("MARKETAUX_RETRY_BACKOFF_MAX", "10"))
+RETRY_AFTER_MAX = float(os.getenv("MARKETAUX_RETRY_AFTER_MAX", "30"))
+CONNECT_TIMEOUT = float(os.getenv("MARKETAUX_CONNECT_TIMEOUT", "5"))
+READ_TIMEOUT = float(os.getenv("MARKETAUX_READ_TIMEOUT", "30"))
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+# eşzamanlılık: aynı anda uçuşta olabilecek istek sayısı ve spekülatif sayfa ön-çekme penceresi
+MAX_CONCURRENCY = int(os.getenv("MARKETAUX_MAX_CONCURRENCY", str(POOL_SIZE)))
+PREFETCH_PAGES = int(os.getenv("MARKETAUX_PREFETCH_PAGES", "2"))
+
+# planın izin verdiği en büyük /news/all "limit" değeri (Free plan: 3)
+PLAN_PAGE_LIMIT = int(os.getenv("MARKETAUX_PLAN_PAGE_LIMIT", "3"))
+
+# bulunamayan entity'ler bu süre boyunca tekrar aranmaz (saniye)
+ENTITY_MISS_TTL = float(os.getenv("MARKETAUX_ENTITY_MISS_TTL", str(24 * 3600)))
+
+# toplu çözümlemede tek /entity/search çağrısına virgülle paketlenen sembol sayısı
+ENTITY_BATCH_SIZE = int(os.getenv("MARKETAUX_ENTITY_BATCH_SIZE", "20"))
+
+# get_last_n_news'i yerel haber deposundan yanıtla; API'ye sadece watermark sonrası sorulur
+NEWS_STORE_ENABLED = os.getenv("MARKETAUX_NEWS_STORE", "1").strip() not in ("0", "false", "no")
+
+# sektör akışı birçok ticker tarafından paylaşılır: bu süre içinde depodan, API'ye gitmeden servis edilir
+INDUSTRY_NEWS_TTL = float(os.getenv("MARKETAUX_INDUSTRY_NEWS_TTL", "1800"))
+# prefetch zamanlayıcısının turlar arası süresi (src.integrations.prefetch)
+PREFETCH_INTERVAL = float(os.getenv("MARKETAUX_PREFETCH_INTERVAL", "900"))
+# ticker akışı (prefetch zamanlayıcısı tarafından tazelenmişse) bu süre içinde depodan servis edilir.
+# Varsayılan: tur aralığı + tur süresi için pay; TTL aralıktan kısa olursa her tur arasında API'ye düşülür
+TICKER_NEWS_TTL_SLACK = float(os.getenv("MARKETAUX_TICKER_NEWS_TTL_SLACK", "300"))
+TICKER_NEWS_TTL = float(os.getenv("MARKETAUX_TICKER_NEWS_TTL", str(PREFETCH_INTERVAL + TICKER_NEWS_TTL_SLACK)))
+
+# Marketaux'un kendi benzer-haber gruplaması; yakın kopyalar ayrıca news_prompt tarafında da elenir
+GROUP_SIMILAR = os.getenv("MARKETAUX_GROUP_SIMILAR", "false").strip().lower()
+
+# acquire() metodu olan herhangi bir nesne (örn. prefetch.TokenBucket); sadece rate_limited bloğundaki çağrılara uygulanır
+_rate_limiter: contextvars.ContextVar[Optional[Any]] = contextvars.ContextVar("marketaux_rate_limiter", default=None)
+
+logger = logging.getLogger(__name__)
+
+# kota başlığı (küçük harf) -> (aile, alan); usage: günlük istek kotası, rate: dakikalık hız sınırı
+QUOTA_HEADERS = {
+    "x-usagelimit-limit": ("usage", "limit"),
+    "x-usagelimit-remaining": ("usage", "remaining"),
+    "x-usagelimit-reset": ("usage", "reset"),
+    "x-ratelimit-limit": ("rate", "limit"),
+    "x-ratelimit-remaining": ("rate", "remaining"),
+    "x-ratelimit-reset": ("rate", "reset"),
+}
+
+# gecikme histogramı kova üst sınırları (ms); son kova sonsuz
+LATENCY_BUCKETS_MS = (50, 100, 250, 500, 1000, 2500, 5000)
+
+
+class _Metrics:
+    """Process içi, thread-safe istek/cache/kota sayaçları. get_metrics() ile okunur."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.endpoints: Dict[str, Dict[str, Any]] = {}
+            self.caches: Dict[str, Dict[str, int]] = {}
+            self.quota: Dict[str, Any] = {}
+
+    def record_request(self, path: str, ms: float, nbytes: int, ok: bool, retries: int = 0) -> None:
+        with self._lock:
+            ep = self.endpoints.setdefault(
+                path,
+                {
+                    "count": 0,
+                    "retries": 0,
+                    "errors": 0,
+                    "bytes": 0,
+                    "total_ms": 0.0,
+                    "max_ms": 0.0,
+                    "histogram": [0] * (len(LATENCY_BUCKETS_MS) + 1),
+                },
+            )
+            ep["count"] += 1
+            ep["retries"] += retries
+            ep["errors"] += 0 if ok else 1
+            ep["bytes"] += nbytes
+            ep["total_ms"] += ms
+            ep["max_ms"] = max(ep["max_ms"], ms)
+            idx = next((i for i, ub in enumerate(LATENCY_BUCKETS_MS) if ms <= ub), len(LATENCY_BUCKETS_MS))
+            ep["histogram"][idx] += 1
+
+    def record_cache(self, name: str, event: str) -> None:
+        with self._lock:
+            c = self.caches.setdefault(name, {})
+            c[event] = c.get(event, 0) + 1
+
+    def record_quota(self, headers: Any) -> None:
+        # Marketaux'un günlük kullanım kotası (X-UsageLimit-*) ve dakikalık hız sınırı (X-RateLimit-*)
+        # ayrı tutulur; sadece bilinen başlık adları okunur
+        found = {k: v for k, v in headers.items() if k.lower() in QUOTA_HEADERS}
+        if not found:
+            return
+        with self._lock:
+            for k, v in found.items():
+                family, field = QUOTA_HEADERS[k.lower()]
+                self.quota.setdefault(family, {})[field] = _to_int(v)
+            self.quota["headers"] = found
+            self.quota["updated_at"] = time.time()
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            endpoints = {}
+            for path, ep in self.endpoints.items():
+                endpoints[path] = {
+                    **ep,
+                    "histogram": dict(zip([f"<={ub}ms" for ub in LATENCY_BUCKETS_MS] + ["inf"], ep["histogram"])),
+                    "avg_ms": ep["total_ms"] / ep["count"] if ep["count"] else 0.0,
+                }
+            caches = {}
+            for name, c in self.caches.items():
+                hits = sum(v for k, v in c.items() if k.endswith("hit"))
+                total = hits + c.get("miss", 0)
+                caches[name] = {**c, "hit_rate": hits / total if total else 0.0}
+            return {
+                "endpoints": endpoints,
+                "caches": caches,
+                "quota": dict(self.quota),
+                "requests": sum(ep["count"] for ep in self.endpoints.values()),
+                # retry'lar dahil API'ye giden toplam istek (kota bunu harcar)
+                "retries": sum(ep["retries"] for ep in self.endpoints.values()),
+                "upstream": sum(ep["count"] + ep["retries"] for ep in self.endpoints.values()),
+                "bytes": sum(ep["bytes"] for ep in self.endpoints.values()),
+            }
+
+
+def _to_int(v: Any) -> Optional[int]:
+    try:
+        return int(str(v).strip())
+    except ValueError:
+        return None
+
+
+_metrics = _Metrics()
+
 
-import requests
+def get_metrics() -> Dict[str, Any]:
+    return _metrics.snapshot()
 
-BASE = "https://api.marketaux.com/v1"
-CACHE_PATH = Path(os.getenv("MARKETAUX_ENTITY_CACHE", ".cache/marketaux_entity_cache.json"))
+
+def reset_metrics() -> None:
+    _metrics.reset()
 
 
 def _token() -> str:
@@ -16,49 +183,39 @@ def _token() -> str:
     return t
 
 
-def _ensure_cache_dir() -> None:
-    CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+@contextmanager
+def rate_limited(limiter: Optional[Any]) -> Iterator[None]:
+    """
+    Blok içinde yapılan API çağrılarını (senkron ya da bloktan başlatılan async) limiter'dan geçirir.
+    Aynı process'teki diğer çağıranlar (örn. dashboard istekleri) etkilenmez.
+    """
+    token = _rate_limiter.set(limiter)
+    try:
+        yield
+    finally:
+        _rate_limiter.reset(token)
 
 
-def _load_cache() -> Dict[str, Any]:
-    _ensure_cache_dir()
-    if not CACHE_PATH.exists():
-        return {"entities": {}}
-    try:
-        return json.loads(CACHE_PATH.read_text(encoding="utf-8"))
-    except Exception:
-        return {"entities": {}}
+def usage_day() -> str:
+    # günlük kullanım sayacının anahtarı (UTC gün)
+    return datetime.now(timezone.utc).strftime("%Y-%m-%d")
 
 
-def _save_cache(cache: Dict[str, Any]) -> None:
-    _ensure_cache_dir()
-    CACHE_PATH.write_text(json.dumps(cache, ensure_ascii=False, indent=2), encoding="utf-8")
+def _record_usage(requests_made: int) -> None:
+    # günlük kota sayacı: prefetch, dashboard ve entity aramaları dahil upstream'e giden her istek (retry'lar dahil)
+    if not NEWS_STORE_ENABLED or requests_made <= 0:
+        return
+    try:
+        get_news_store().add_usage(usage_day(), requests_made)
+    except sqlite3.Error:
+        logger.warning("Marketaux kullanım sayacı yazılamadı", exc_info=True)
 
 
-def _get(path: str, params: Dict[str, Any]) -> Dict[str, Any]:
-    params = {"api_token": _token(), **params}
-    r = requests.get(f"{BASE}{path}", params=params, timeout=30)
-    if r.status_code != 200:
-        raise RuntimeError(f"Marketaux HTTP {r.status_code}: {r.text}")
-    return r.json()
+_TOKEN_RE = re.compile(r"(api_token=)[^&\s'\")]+")
 
 
-def _entity_search(
-    *,
-    search: Optional[str] = None,
-    symbols: Optional[str] = None,
-    countries: Optional[str] = None,
-    types: str = "equity",
-    page: int = 1,
-) -> List[Dict[str, Any]]:
-    params: Dict[str, Any] = {"page": page, "types": types}
-    if search:
-        params["search"] = search
-    if symbols:
-        params["symbols"] = symbols
-    if countries:
-        params["countries"] = countries
-    return _get("/entity/search", params).get("data", [])
+def _redact(text: str) -> str:
+    return _TOKEN_RE.sub(r"\1***", text)
 
 
 def _dedupe_keep_order(items: List[str]) -> List[str]:
@@ -104,187 +261,164 @@ def _pick_best(cands: List[Dict[str, Any]], prefer_country: str = "us") -> Optio
     return cands[0]
 
 
-def resolve_entity(
-    ticker_like: str,
-    *,
-    company_name: Optional[str] = None,
-    prefer_country: str = "us",
-) -> Dict[str, Any]:
-    cache = _load_cache()
-    entities = cache.get("entities", {})
-
-    key = (ticker_like or "").strip().upper()
-    if key in entities:
-        return entities[key]
-
-    for q in _variants(key):
-        cands = _entity_search(symbols=q, countries=prefer_country)
-        best = _pick_best(cands, prefer_country=prefer_country)
-        if best:
-            ent = {
-                "symbol": best.get("symbol"),
-                "name": best.get("name"),
-                "industry": best.get("industry"),
-                "country": best.get("country"),
-                "type": best.get("type"),
-            }
-            entities[key] = ent
-            cache["entities"] = entities
-            _save_cache(cache)
-            return ent
-
-    for q in _variants(key):
-        cands = _entity_search(search=q, countries=prefer_country)
-        best = _pick_best(cands, prefer_country=prefer_country)
-        if best:
-            ent = {
-                "symbol": best.get("symbol"),
-                "name": best.get("name"),
-                "industry": best.get("industry"),
-                "country": best.get("country"),
-                "type": best.get("type"),
-            }
-            entities[key] = ent
-            cache["entities"] = entities
-            _save_cache(cache)
-            return ent
-
-    for q in _variants(key):
-        cands = _entity_search(symbols=q)
-        best = _pick_best(cands, prefer_country=prefer_country)
-        if best:
-            ent = {
-                "symbol": best.get("symbol"),
-                "name": best.get("name"),
-                "industry": best.get("industry"),
-                "country": best.get("country"),
-                "type": best.get("type"),
-            }
-            entities[key] = ent
-            cache["entities"] = entities
-            _save_cache(cache)
-            return ent
-
-    for q in _variants(key):
-        cands = _entity_search(search=q)
-        best = _pick_best(cands, prefer_country=prefer_country)
-        if best:
-            ent = {
-                "symbol": best.get("symbol"),
-                "name": best.get("name"),
-                "industry": best.get("industry"),
-                "country": best.get("country"),
-                "type": best.get("type"),
-            }
-            entities[key] = ent
-            cache["entities"] = entities
-            _save_cache(cache)
-            return ent
+def _to_entity(best: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "symbol": best.get("symbol"),
+        "name": best.get("name"),
+        "industry": best.get("industry"),
+        "country": best.get("country"),
+        "type": best.get("type"),
+    }
 
+
+def _entity_tiers(key: str, company_name: Optional[str], prefer_country: str) -> List[List[Dict[str, Any]]]:
+    """
+    Öncelik sırasına göre arama katmanları. Bir katmanın içindeki sorgular birbirinden
+    bağımsızdır; katmanlar ise sırayla denenir.
+    """
+    vs = _variants(key)
+    tiers = [
+        [{"symbols": q, "countries": prefer_country} for q in vs],
+        [{"search": q, "countries": prefer_country} for q in vs],
+        [{"symbols": q} for q in vs],
+        [{"search": q} for q in vs],
+    ]
     if company_name:
         name_qs = _dedupe_keep_order([company_name.strip(), company_name.strip().replace("-", " ")])
-        for q in name_qs:
-            cands = _entity_search(search=q, countries=prefer_country)
-            best = _pick_best(cands, prefer_country=prefer_country)
-            if best:
-                ent = {
-                    "symbol": best.get("symbol"),
-                    "name": best.get("name"),
-                    "industry": best.get("industry"),
-                    "country": best.get("country"),
-                    "type": best.get("type"),
-                }
-                entities[key] = ent
-                cache["entities"] = entities
-                _save_cache(cache)
-                return ent
-
-        for q in name_qs:
-            cands = _entity_search(search=q)
-            best = _pick_best(cands, prefer_country=prefer_country)
-            if best:
-                ent = {
-                    "symbol": best.get("symbol"),
-                    "name": best.get("name"),
-                    "industry": best.get("industry"),
-                    "country": best.get("country"),
-                    "type": best.get("type"),
-                }
-                entities[key] = ent
-                cache["entities"] = entities
-                _save_cache(cache)
-                return ent
+        tiers.append([{"search": q, "countries": prefer_country} for q in name_qs])
+        tiers.append([{"search": q} for q in name_qs])
+    return tiers
 
-    raise ValueError(f"Entity bulunamadı: {ticker_like} (company_name={company_name})")
 
+def _miss_key(key: str, company_name: Optional[str], prefer_country: str) -> str:
+    return f"{key}|{(company_name or '').strip()}|{(prefer_country or '').lower()}"
 
-def _news_page(params: Dict[str, Any]) -> Dict[str, Any]:
-    base = {
-        "filter_entities": "true",
-        "must_have_entities": "true",
-        "group_similar": "false",
-        "language": "en",
-        "sort": "published_at",
-    }
-    base.update(params)
-    return _get("/news/all", base)
 
+def _plan_pages(n: int, per_req: Optional[int] = None, found: Optional[int] = None) -> Tuple[int, int]:
+    """
+    n haber için (sayfa boyutu, gereken minimum sayfa sayısı) döndürür.
+    per_req verilirse üst sınır kabul edilir; yoksa planın izin verdiği en büyük limit kullanılır.
+    found (meta'dan gelen toplam) biliniyorsa hedef ona göre kırpılır.
+    """
+    cap = PLAN_PAGE_LIMIT if per_req is None else min(per_req, PLAN_PAGE_LIMIT)
+    target = n if found is None else min(n, found)
+    if target <= 0:
+        return max(1, min(cap, n)), 0
+    size = max(1, min(cap, n))
+    return size, -(-target // size)
 
-def get_last_n_news(params_key: str, params_val: str, n: int = 10, per_req: int = 3) -> List[Dict[str, Any]]:
-    collected: List[Dict[str, Any]] = []
-    seen = set()
-    page = 1
 
-    while len(collected) < n:
-        resp = _news_page({params_key: params_val, "limit": per_req, "page": page})
-        items = resp.get("data", [])
-        if not items:
-            break
+def _published_after(watermark: str) -> str:
+    # "2026-02-13T01:23:45.000000Z" -> "2026-02-13T01:23:45" (Marketaux published_after formatı)
+    return watermark.replace("Z", "")[:19]
 
-        for it in items:
-            uid = it.get("uuid")
-            if uid and uid in seen:
-                continue
-            if uid:
-                seen.add(uid)
-            collected.append(it)
-            if len(collected) >= n:
-                break
 
-        meta = resp.get("meta", {})
-        returned = meta.get("returned")
-        limit = meta.get("limit")
-        if returned is not None and limit is not None and returned < limit:
-            break
+def _has_depth(store: NewsStore, params_key: str, params_val: str, n: int) -> bool:
+    # depo n makaleyi karşılıyor mu: ya yeterli makale var ya da son tam çekimde upstream'de daha fazlası yoktu
+    return store.count(params_key, params_val) >= n or store.exhausted(params_key, params_val)
 
-        page += 1
 
-    return collected[:n]
 
 
-def get_ticker_and_industry_news(
+def close_session() -> None:
+    """Senkron API'nin paylaşılan HTTP istemcisini kapatır; sonraki çağrı yenisini açar."""
+    from src.integrations import marketaux_async as aio
+
+    aio.close_background()
+
+
+def resolve_entity(
     ticker_like: str,
     *,
     company_name: Optional[str] = None,
-    country: str = "us",
-    n: int = 10,
-    per_req: int = 3,
+    prefer_country: str = "us",
 ) -> Dict[str, Any]:
-    ent = resolve_entity(ticker_like, company_name=company_name, prefer_country=country)
+    from src.integrations import marketaux_async as aio
 
-    symbol = (ent.get("symbol") or "").strip()
-    industry = (ent.get("industry") or "").strip()
+    return aio.run_sync(aio.resolve_entity(ticker_like, company_name=company_name, prefer_country=prefer_country))
 
-    if not symbol:
-        raise ValueError(f"Symbol boş döndü: {ticker_like}")
 
-    if not industry:
-        cands = _entity_search(symbols=symbol)
-        best = _pick_best(cands, prefer_country=country)
-        industry = (best.get("industry") if best else "") or ""
-        industry = industry.strip()
+def resolve_entities(
+    tickers: Iterable[str],
+    *,
+    company_names: Optional[Dict[str, str]] = None,
+    prefer_country: str = "us",
+) -> Dict[str, Optional[Dict[str, Any]]]:
+    """
+    Birden çok ticker'ı mümkün olan en az /entity/search çağrısıyla çözer:
+    sembol varyantları virgülle paketlenip toplu sorgulanır, kalanlar resolve_entity'ye düşer.
+    Çıktı: {TICKER: entity veya None}
+    """
+    from src.integrations import marketaux_async as aio
+
+    return aio.run_sync(
+        aio.resolve_entities(list(tickers), company_names=company_names, prefer_country=prefer_country)
+    )
+
+
+def get_last_n_news(
+    params_key: str,
+    params_val: str,
+    n: int = 10,
+    per_req: Optional[int] = None,
+    *,
+    prefetch: int = PREFETCH_PAGES,
+    stats: Optional[Dict[str, Any]] = None,
+    use_store: bool = NEWS_STORE_ENABLED,
+    max_age: Optional[float] = None,
+) -> List[Dict[str, Any]]:
+    """
+    max_age (saniye) verilirse ve akış bu süre içinde yenilenmişse (depoda en az n makale ya da
+    upstream'deki makalelerin tamamı varsa)
+    sonuç API'ye hiç gitmeden depodan döner. Aynı akışı isteyen eşzamanlı çağrılar tek yenileme bekler.
+    """
+    from src.integrations import marketaux_async as aio
+
+    return aio.run_sync(
+        aio.get_last_n_news(
+            params_key,
+            params_val,
+            n=n,
+            per_req=per_req,
+            prefetch=prefetch,
+            stats=stats,
+            use_store=use_store,
+            max_age=max_age,
+        )
+    )
+
+
+def get_industry_news(
+    industry: str,
+    n: int = 10,
+    per_req: Optional[int] = None,
+    *,
+    stats: Optional[Dict[str, Any]] = None,
+    max_age: float = INDUSTRY_NEWS_TTL,
+) -> List[Dict[str, Any]]:
+    return get_last_n_news("industries", industry, n=n, per_req=per_req, stats=stats, max_age=max_age)
 
-    ticker_news = get_last_n_news("symbols", symbol, n=n, per_req=per_req)
-    industry_news = get_last_n_news("industries", industry, n=n, per_req=per_req) if industry else []
 
-    return {"symbol": symbol, "industry": industry, "ticker_news": ticker_news, "industry_news": industry_news}
+def get_ticker_and_industry_news(
+    ticker_like: str,
+    *,
+    company_name: Optional[str] = None,
+    country: str = "us",
+    n: int = 10,
+    per_req: Optional[int] = None,
+    concurrent: bool = True,
+    ticker_max_age: Optional[float] = None,
+) -> Dict[str, Any]:
+    from src.integrations import marketaux_async as aio
+
+    return aio.run_sync(
+        aio.get_ticker_and_industry_news(
+            ticker_like,
+            company_name=company_name,
+            country=country,
+            n=n,
+            per_req=per_req,
+            concurrent=concurrent,
+            ticker_max_age=ticker_max_age,
+        )
+    )
@@ -0,0 +1,600 @@
+"""
+Marketaux istemcisinin asyncio çekirdeği.
+
+HTTP, httpx.AsyncClient üzerinden yapılır: event loop başına tek istemci ve keep-alive havuzu
+(MARKETAUX_POOL_SIZE bağlantı), 429/5xx ve bağlantı hataları için backoff'lu retry (Retry-After dahil),
+loop başına asyncio.Semaphore ile uçuştaki istek sınırı (MARKETAUX_MAX_CONCURRENCY). Entity arama katmanları,
+haber sayfaları ve ticker/sektör akışları coroutine'lerle eşzamanlı çekilir; bekleyen istek thread tutmaz.
+
+Senkron API (marketaux.py) buradaki coroutine'lerin ince sarmalayıcısıdır: run_sync çağrıları tek bir arka plan
+event loop'unda çalıştırır, böylece dashboard, prefetch ve rapor thread'leri aynı bağlantı havuzunu ve akış
+kilitlerini paylaşır. Sabitler, metrikler, kullanım sayacı ve saf yardımcılar marketaux.py'de kalır.
+
+Public coroutine'ler:
+  - deadline (saniye) ile sınırlandırılabilir: süre aşılırsa TimeoutError,
+  - iptal edilebilir: uçuştaki HTTP isteği de iptal edilir.
+Entity/haber depoları (SQLite, WAL) yerel ve kısa işlemlerdir; loop üzerinde doğrudan çağrılır.
+Kendi loop'unu açıp kapatan çağıranlar (asyncio.run) sonunda aclose() ile istemciyi kapatmalıdır.
+"""
+
+import asyncio
+import os
+import threading
+import time
+import weakref
+from typing import Any, Coroutine, Dict, Iterable, List, Mapping, Optional, Tuple, TypeVar, Union
+
+import httpx
+
+from src.integrations import marketaux
+from src.integrations.entity_store import get_entity_store
+from src.integrations.marketaux import (
+    CONNECT_TIMEOUT,
+    ENTITY_BATCH_SIZE,
+    ENTITY_MISS_TTL,
+    GROUP_SIMILAR,
+    INDUSTRY_NEWS_TTL,
+    MAX_CONCURRENCY,
+    MAX_RETRIES,
+    NEWS_STORE_ENABLED,
+    POOL_SIZE,
+    PREFETCH_PAGES,
+    READ_TIMEOUT,
+    RETRY_AFTER_MAX,
+    RETRY_BACKOFF,
+    RETRY_BACKOFF_MAX,
+    RETRY_STATUSES,
+    _dedupe_keep_order,
+    _entity_tiers,
+    _has_depth,
+    _metrics,
+    _miss_key,
+    _pick_best,
+    _plan_pages,
+    _published_after,
+    _rate_limiter,
+    _record_usage,
+    _redact,
+    _to_entity,
+    _token,
+    _variants,
+)
+from src.integrations.news_store import NewsStore, get_news_store
+
+# fetch_many'de aynı anda işlenen sembol sınırı; HTTP eşzamanlılığı ayrıca MAX_CONCURRENCY ile sınırlı
+ASYNC_CONCURRENCY = int(os.getenv("MARKETAUX_ASYNC_CONCURRENCY", str(4 * MAX_CONCURRENCY)))
+
+T = TypeVar("T")
+
+
+class _LoopState:
+    """Bir event loop'a bağlı kaynaklar: asyncio/httpx nesneleri oluşturuldukları loop dışında kullanılamaz."""
+
+    def __init__(self) -> None:
+        self.client = httpx.AsyncClient(
+            headers={"Accept": "application/json"},
+            # pool=None: havuz doluysa yeni bağlantı açmak yerine boş bağlantıyı bekle
+            timeout=httpx.Timeout(READ_TIMEOUT, connect=CONNECT_TIMEOUT, pool=None),
+            limits=httpx.Limits(max_connections=POOL_SIZE, max_keepalive_connections=POOL_SIZE),
+        )
+        self.inflight = asyncio.Semaphore(max(1, MAX_CONCURRENCY))
+        self.symbols = asyncio.Semaphore(max(1, ASYNC_CONCURRENCY))
+        # aynı akışı isteyen eşzamanlı çağrılar tek yenileme bekler
+        self.stream_locks: Dict[Tuple[str, str], asyncio.Lock] = {}
+
+
+_states: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, _LoopState]" = weakref.WeakKeyDictionary()
+
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_loop_thread: Optional[threading.Thread] = None
+_loop_lock = threading.Lock()
+
+
+def _state() -> _LoopState:
+    loop = asyncio.get_running_loop()
+    st = _states.get(loop)
+    if st is None:
+        st = _states[loop] = _LoopState()
+    return st
+
+
+async def aclose() -> None:
+    """Çalışan loop'un HTTP istemcisini kapatır; sonraki çağrı yenisini açar."""
+    st = _states.pop(asyncio.get_running_loop(), None)
+    if st is not None:
+        await st.client.aclose()
+
+
+def _background_loop() -> asyncio.AbstractEventLoop:
+    global _loop, _loop_thread
+    if _loop is None:
+        with _loop_lock:
+            if _loop is None:
+                loop = asyncio.new_event_loop()
+                _loop_thread = threading.Thread(target=loop.run_forever, name="marketaux-loop", daemon=True)
+                _loop_thread.start()
+                _loop = loop
+    return _loop
+
+
+def run_sync(coro: Coroutine[Any, Any, T]) -> T:
+    """
+    Senkron API köprüsü: coroutine'i paylaşılan arka plan loop'unda çalıştırır ve sonucunu bekler.
+    Çağıranın contextvars'ı (örn. rate_limited) coroutine'e taşınır; bekleme kesilirse coroutine iptal edilir.
+    """
+    loop = _background_loop()
+    if threading.current_thread() is _loop_thread:
+        coro.close()
+        raise RuntimeError("Senkron Marketaux API'si arka plan loop'u içinden çağrılamaz; coroutine'i await edin")
+    fut = asyncio.run_coroutine_threadsafe(coro, loop)
+    try:
+        return fut.result()
+    except BaseException:
+        fut.cancel()
+        raise
+
+
+def close_background() -> None:
+    """Senkron API'nin (arka plan loop'u) HTTP istemcisini kapatır."""
+    if _loop is not None:
+        run_sync(aclose())
+
+
+def _backoff(attempt: int, retry_after: Optional[str] = None) -> float:
+    # Retry-After (saniye, RETRY_AFTER_MAX ile kırpılır) varsa ona, yoksa üstel backoff'a uy
+    if retry_after:
+        try:
+            return min(max(0.0, float(retry_after)), RETRY_AFTER_MAX)
+        except ValueError:
+            pass
+    return min(RETRY_BACKOFF * 2 ** (attempt - 1), RETRY_BACKOFF_MAX)
+
+
+async def _get(path: str, params: Dict[str, Any]) -> Dict[str, Any]:
+    params = {"api_token": _token(), **params}
+    limiter = _rate_limiter.get()
+    if limiter is not None:
+        # limiter.acquire bloklayıcı (örn. prefetch.TokenBucket): loop'u tutmasın diye thread'de beklenir
+        await asyncio.to_thread(limiter.acquire)
+    st = _state()
+    t0 = time.perf_counter()
+    attempts = 0
+    r: Optional[httpx.Response] = None
+    try:
+        async with st.inflight:
+            while True:
+                attempts += 1
+                r = None
+                try:
+                    # BASE çağrı anında okunur (mock sunucu / test için değiştirilebilir)
+                    r = await st.client.get(f"{marketaux.BASE}{path}", params=params)
+                except httpx.TransportError:
+                    if attempts > MAX_RETRIES:
+                        raise
+                    delay = _backoff(attempts)
+                else:
+                    if r.status_code not in RETRY_STATUSES or attempts > MAX_RETRIES:
+                        break
+                    delay = _backoff(attempts, r.headers.get("retry-after"))
+                await asyncio.sleep(delay)
+    except httpx.RequestError as e:
+        # hata mesajları tam URL'yi (api_token dahil) taşıyabilir: log, UI ve e-postaya sızmasın
+        raise type(e)(_redact(str(e))) from None
+    finally:
+        # hata ve iptal dahil: upstream'e giden her deneme (retry'lar dahil) metriğe ve kotaya yazılır
+        if attempts:
+            ok = r is not None and r.status_code == 200
+            nbytes = len(r.content) if r is not None else 0
+            _metrics.record_request(path, (time.perf_counter() - t0) * 1000, nbytes, ok=ok, retries=attempts - 1)
+            _record_usage(attempts)
+    _metrics.record_quota(r.headers)
+    if r.status_code != 200:
+        raise RuntimeError(f"Marketaux HTTP {r.status_code}: {r.text}")
+    return r.json()
+
+
+async def _entity_search(
+    *,
+    search: Optional[str] = None,
+    symbols: Optional[str] = None,
+    countries: Optional[str] = None,
+    types: str = "equity",
+    page: int = 1,
+) -> List[Dict[str, Any]]:
+    params: Dict[str, Any] = {"page": page, "types": types}
+    if search:
+        params["search"] = search
+    if symbols:
+        params["symbols"] = symbols
+    if countries:
+        params["countries"] = countries
+    return (await _get("/entity/search", params)).get("data", [])
+
+
+async def _search_tier(queries: List[Dict[str, Any]], prefer_country: str) -> Optional[Dict[str, Any]]:
+    results = await asyncio.gather(*(_entity_search(**q) for q in queries), return_exceptions=True)
+
+    # sonuçlar eşzamanlı gelse de seçim, seri sürümdeki sıra ile yapılır: bir sorgunun hatası sadece
+    # kendinden önceki sorguların hiçbiri sonuç vermediyse fırlatılır (seri sürümde de oraya gelinirdi)
+    for cands in results:
+        if isinstance(cands, BaseException):
+            raise cands
+        best = _pick_best(cands, prefer_country=prefer_country)
+        if best:
+            return best
+    return None
+
+
+async def _resolve_tiers(
+    key: str, company_name: Optional[str], prefer_country: str, *, skip: int = 0
+) -> Dict[str, Any]:
+    # katmanları öncelik sırasıyla dene; skip: çağıranın zaten (toplu) sorguladığı ilk katman sayısı
+    store = get_entity_store()
+    for queries in _entity_tiers(key, company_name, prefer_country)[skip:]:
+        best = await _search_tier(queries, prefer_country)
+        if best:
+            ent = _to_entity(best)
+            store.put(key, ent)
+            return ent
+
+    store.put_miss(_miss_key(key, company_name, prefer_country))
+    raise ValueError(f"Entity bulunamadı: {key} (company_name={company_name})")
+
+
+async def resolve_entity(
+    ticker_like: str,
+    *,
+    company_name: Optional[str] = None,
+    prefer_country: str = "us",
+    deadline: Optional[float] = None,
+) -> Dict[str, Any]:
+    store = get_entity_store()
+
+    key = (ticker_like or "").strip().upper()
+    cached = store.get(key)
+    if cached is not None:
+        _metrics.record_cache("entity", "hit")
+        return cached
+
+    if store.is_miss(_miss_key(key, company_name, prefer_country), ttl=ENTITY_MISS_TTL):
+        _metrics.record_cache("entity", "negative_hit")
+        raise ValueError(f"Entity bulunamadı (negatif cache): {ticker_like} (company_name={company_name})")
+
+    _metrics.record_cache("entity", "miss")
+    async with asyncio.timeout(deadline):
+        return await _resolve_tiers(key, company_name, prefer_country)
+
+
+async def _entity_search_all(symbols: List[str], countries: Optional[str] = None) -> List[Dict[str, Any]]:
+    out: List[Dict[str, Any]] = []
+    page = 1
+    while True:
+        params: Dict[str, Any] = {"page": page, "types": "equity", "symbols": ",".join(symbols)}
+        if countries:
+            params["countries"] = countries
+        resp = await _get("/entity/search", params)
+        items = resp.get("data", [])
+        out.extend(items)
+
+        meta = resp.get("meta", {})
+        returned = meta.get("returned")
+        limit = meta.get("limit")
+        if not items or returned is None or limit is None or returned < limit:
+            return out
+        page += 1
+
+
+async def resolve_entities(
+    tickers: Iterable[str],
+    *,
+    company_names: Optional[Dict[str, str]] = None,
+    prefer_country: str = "us",
+    deadline: Optional[float] = None,
+) -> Dict[str, Optional[Dict[str, Any]]]:
+    """marketaux.resolve_entities ile aynı çıktı; deadline tüm çağrıyı kapsar."""
+    store = get_entity_store()
+    company_names = {k.strip().upper(): v for k, v in (company_names or {}).items()}
+
+    keys = _dedupe_keep_order([(t or "").strip().upper() for t in tickers])
+    out: Dict[str, Optional[Dict[str, Any]]] = {}
+    pending: List[str] = []
+    for key in keys:
+        cached = store.get(key)
+        if cached is not None:
+            _metrics.record_cache("entity", "hit")
+            out[key] = cached
+        elif store.is_miss(_miss_key(key, company_names.get(key), prefer_country), ttl=ENTITY_MISS_TTL):
+            _metrics.record_cache("entity", "negative_hit")
+            out[key] = None
+        else:
+            _metrics.record_cache("entity", "miss")
+            pending.append(key)
+
+    if pending:
+        async with asyncio.timeout(deadline):
+            # resolve_entity'nin 1. katmanı (sembol + ülke filtresi) toplu: her varyantın tek tek sorgusuyla
+            # aynı adaylar tek /entity/search çağrısında gelir
+            variants = {key: _variants(key) for key in pending}
+            flat = _dedupe_keep_order([v for vs in variants.values() for v in vs])
+            chunks = [flat[i : i + ENTITY_BATCH_SIZE] for i in range(0, len(flat), ENTITY_BATCH_SIZE)]
+            results = await asyncio.gather(*(_entity_search_all(c, countries=prefer_country) for c in chunks))
+
+            by_symbol: Dict[str, List[Dict[str, Any]]] = {}
+            for cands in results:
+                for it in cands:
+                    by_symbol.setdefault((it.get("symbol") or "").strip().upper(), []).append(it)
+
+            leftovers: List[str] = []
+            for key in pending:
+                best = None
+                for q in variants[key]:
+                    best = _pick_best(by_symbol.get(q, []), prefer_country=prefer_country)
+                    if best:
+                        break
+                if best:
+                    ent = _to_entity(best)
+                    store.put(key, ent)
+                    out[key] = ent
+                else:
+                    leftovers.append(key)
+
+            # kalanlar resolve_entity ile aynı öncelik sırasında, 1. katman tekrar sorulmadan devam eder
+            async def _leftover(key: str) -> Optional[Dict[str, Any]]:
+                try:
+                    return await _resolve_tiers(key, company_names.get(key), prefer_country, skip=1)
+                except ValueError:
+                    return None
+
+            for key, ent in zip(leftovers, await asyncio.gather(*(_leftover(k) for k in leftovers))):
+                out[key] = ent
+
+    return {key: out.get(key) for key in keys}
+
+
+async def _news_page(params: Dict[str, Any]) -> Dict[str, Any]:
+    base = {
+        "filter_entities": "true",
+        "must_have_entities": "true",
+        "group_similar": GROUP_SIMILAR,
+        "language": "en",
+        "sort": "published_at",
+    }
+    base.update(params)
+    return await _get("/news/all", base)
+
+
+async def _fetch_pages(query: Dict[str, Any], per_req: int, pages: List[int]) -> List[Dict[str, Any]]:
+    return list(await asyncio.gather(*(_news_page({**query, "limit": per_req, "page": p}) for p in pages)))
+
+
+async def _collect_news(
+    query: Dict[str, Any],
+    n: int,
+    per_req: Optional[int],
+    *,
+    prefetch: int,
+    stats: Optional[Dict[str, Any]],
+) -> List[Dict[str, Any]]:
+    collected: List[Dict[str, Any]] = []
+    seen = set()
+    page_size, planned = _plan_pages(n, per_req)
+    last_page: Optional[int] = None  # meta.found'dan hesaplanan son sayfa
+    requests_made = 0
+    page = 1
+    done = False
+
+    while len(collected) < n and not done:
+        # kalan ihtiyacı karşılayacak kadar sayfayı (en fazla prefetch) aynı anda iste
+        need_pages = -(-(n - len(collected)) // page_size)
+        window = max(1, min(prefetch, need_pages))
+        if last_page is not None:
+            window = min(window, last_page - page + 1)
+            if window <= 0:
+                break
+        pages = list(range(page, page + window))
+
+        requests_made += len(pages)
+        for resp in await _fetch_pages(query, page_size, pages):
+            items = resp.get("data", [])
+            if not items:
+                done = True
+                break
+
+            for it in items:
+                uid = it.get("uuid")
+                if uid and uid in seen:
+                    continue
+                if uid:
+                    seen.add(uid)
+                collected.append(it)
+                if len(collected) >= n:
+                    break
+
+            meta = resp.get("meta", {})
+            returned = meta.get("returned")
+            limit = meta.get("limit")
+            if returned is not None and limit is not None and returned < limit:
+                done = True
+                break
+
+            found = meta.get("found")
+            if found is not None and last_page is None:
+                _, last_page = _plan_pages(int(found), page_size)
+
+            if len(collected) >= n:
+                break
+
+        page += window
+
+    if stats is not None:
+        stats.update(
+            {
+                "requests": requests_made,
+                "page_size": page_size,
+                "planned_pages": planned,
+                "returned": min(len(collected), n),
+            }
+        )
+
+    return collected[:n]
+
+
+async def _refresh_stream(
+    store: NewsStore,
+    query: Dict[str, Any],
+    params_key: str,
+    params_val: str,
+    n: int,
+    per_req: Optional[int],
+    *,
+    prefetch: int,
+    stats: Optional[Dict[str, Any]],
+) -> List[Dict[str, Any]]:
+    wm = store.watermark(params_key, params_val)
+    incremental = bool(wm) and _has_depth(store, params_key, params_val, n)
+    if incremental:
+        # depoda yeterli geçmiş var (ya da upstream'deki her şey zaten depoda):
+        # sadece high-water mark'tan yeni makaleleri iste
+        # yeni makale sayısı genelde az: spekülatif sayfa ön-çekme israf olur
+        query["published_after"] = _published_after(wm)
+        prefetch = 1
+
+    fresh = await _collect_news(query, n, per_req, prefetch=prefetch, stats=stats)
+    store.upsert(params_key, params_val, fresh)
+    # tam çekim n'den az döndüyse upstream tükendi: sonraki yenilemeler artımlı olabilir
+    store.mark_refreshed(params_key, params_val, exhausted=None if incremental else len(fresh) < n)
+
+    out = store.latest(params_key, params_val, n)
+    if stats is not None:
+        stats.update({"incremental": incremental, "fetched": len(fresh), "returned": len(out)})
+    return out
+
+
+async def get_last_n_news(
+    params_key: str,
+    params_val: str,
+    n: int = 10,
+    per_req: Optional[int] = None,
+    *,
+    prefetch: int = PREFETCH_PAGES,
+    stats: Optional[Dict[str, Any]] = None,
+    use_store: bool = NEWS_STORE_ENABLED,
+    max_age: Optional[float] = None,
+    deadline: Optional[float] = None,
+) -> List[Dict[str, Any]]:
+    """marketaux.get_last_n_news ile aynı çıktı; deadline tüm çağrıyı kapsar."""
+    query: Dict[str, Any] = {params_key: params_val}
+    async with asyncio.timeout(deadline):
+        if not use_store:
+            return await _collect_news(query, n, per_req, prefetch=prefetch, stats=stats)
+
+        store = get_news_store()
+        lock = _state().stream_locks.setdefault((params_key, params_val), asyncio.Lock())
+        async with lock:
+            if max_age is not None:
+                ts = store.refreshed_at(params_key, params_val)
+                if ts is not None and time.time() - ts < max_age and _has_depth(store, params_key, params_val, n):
+                    out = store.latest(params_key, params_val, n)
+                    _metrics.record_cache("news", "hit")
+                    if stats is not None:
+                        stats.update({"requests": 0, "cached": True, "returned": len(out)})
+                    return out
+
+            _metrics.record_cache("news", "miss")
+            return await _refresh_stream(
+                store, query, params_key, params_val, n, per_req, prefetch=prefetch, stats=stats
+            )
+
+
+async def get_industry_news(
+    industry: str,
+    n: int = 10,
+    per_req: Optional[int] = None,
+    *,
+    stats: Optional[Dict[str, Any]] = None,
+    max_age: float = INDUSTRY_NEWS_TTL,
+    deadline: Optional[float] = None,
+) -> List[Dict[str, Any]]:
+    return await get_last_n_news(
+        "industries", industry, n=n, per_req=per_req, stats=stats, max_age=max_age, deadline=deadline
+    )
+
+
+async def get_ticker_and_industry_news(
+    ticker_like: str,
+    *,
+    company_name: Optional[str] = None,
+    country: str = "us",
+    n: int = 10,
+    per_req: Optional[int] = None,
+    concurrent: bool = True,
+    ticker_max_age: Optional[float] = None,
+    deadline: Optional[float] = None,
+) -> Dict[str, Any]:
+    """marketaux.get_ticker_and_industry_news ile aynı çıktı; deadline tüm çağrıyı kapsar."""
+    async with asyncio.timeout(deadline):
+        ent = await resolve_entity(ticker_like, company_name=company_name, prefer_country=country)
+
+        symbol = (ent.get("symbol") or "").strip()
+        industry = (ent.get("industry") or "").strip()
+        if not symbol:
+            raise ValueError(f"Symbol boş döndü: {ticker_like}")
+
+        if not industry:
+            cands = await _entity_search(symbols=symbol)
+            best = _pick_best(cands, prefer_country=country)
+            industry = ((best.get("industry") if best else "") or "").strip()
+
+        t_stats: Dict[str, Any] = {}
+        i_stats: Dict[str, Any] = {}
+        t_coro = get_last_n_news("symbols", symbol, n=n, per_req=per_req, stats=t_stats, max_age=ticker_max_age)
+        if concurrent and industry:
+            # iki akış birbirinden bağımsız: toplam süre en yavaş akışa yaklaşır
+            ticker_news, industry_news = await asyncio.gather(
+                t_coro, get_industry_news(industry, n=n, per_req=per_req, stats=i_stats)
+            )
+        else:
+            ticker_news = await t_coro
+            industry_news = await get_industry_news(industry, n=n, per_req=per_req, stats=i_stats) if industry else []
+
+    return {
+        "symbol": symbol,
+        "industry": industry,
+        "ticker_news": ticker_news,
+        "industry_news": industry_news,
+        "requests": {"ticker": t_stats.get("requests", 0), "industry": i_stats.get("requests", 0)},
+    }
+
+
+async def fetch_many(
+    tickers: Union[Mapping[str, str], Iterable[str]],
+    *,
+    country: str = "us",
+    n: int = 10,
+    ticker_max_age: Optional[float] = None,
+    deadline: Optional[float] = None,
+    total_deadline: Optional[float] = None,
+) -> Dict[str, Union[Dict[str, Any], BaseException]]:
+    """
+    Çok sayıda sembolün haberlerini eşzamanlı çeker (aynı anda en fazla ASYNC_CONCURRENCY sembol).
+    tickers: {görünen ad: TICKER} (TICKERS biçimi) veya ticker listesi.
+    deadline sembol başına (sıra beklemesi hariç), total_deadline tüm toplu çağrı için; bir sembolün hatası
+    veya süre aşımı diğerlerini durdurmaz, sonuçta istisna nesnesi olarak döner.
+    total_deadline aşılırsa TimeoutError.
+    """
+    if isinstance(tickers, Mapping):
+        names = {t: label for label, t in tickers.items()}
+    else:
+        names = {t: None for t in tickers}
+
+    sem = _state().symbols
+
+    async def _one(t: str, label: Optional[str]) -> Dict[str, Any]:
+        async with sem:
+            return await get_ticker_and_industry_news(
+                t, company_name=label, country=country, n=n, ticker_max_age=ticker_max_age, deadline=deadline
+            )
+
+    async with asyncio.timeout(total_deadline):
+        results = await asyncio.gather(*(_one(t, label) for t, label in names.items()), return_exceptions=True)
+    return dict(zip(names, results))
@@ -0,0 +1,270 @@
+import os
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+NEWS_DB_PATH = Path(os.getenv("MARKETAUX_NEWS_DB", ".cache/marketaux_news.sqlite3"))
+
+_ENTITY_FIELD = {"symbols": "symbol", "industries": "industry"}
+
+
+def stream_relevance(kind: str, value: str, it: Dict[str, Any]) -> Optional[float]:
+    """
+    Makalenin (kind, value) akışıyla ilgisi, [0, 1]: akışın sembolü/sektörü ile eşleşen entity'nin Marketaux
+    match_score'u, makaledeki en yüksek match_score'a oranla (haberin asıl konusu 1, yan değinme < 1).
+    Entity listesi yoksa / eşleşme yoksa None (ağırlıklandırmada nötr, 1 sayılır).
+    """
+    field = _ENTITY_FIELD.get(kind)
+    scores = []
+    mine = None
+    for ent in it.get("entities") or []:
+        try:
+            score = float(ent.get("match_score"))
+        except (TypeError, ValueError):
+            continue
+        scores.append(score)
+        if field and str(ent.get(field) or "").strip().upper() == value.strip().upper():
+            mine = score if mine is None else max(mine, score)
+    top = max(scores, default=0.0)
+    if mine is None or top <= 0:
+        return None
+    return mine / top
+
+
+class NewsStore:
+    """
+    Marketaux haberleri için kalıcı, artımlı depo (SQLite, WAL).
+      - articles: uuid -> ham makale JSON'u
+      - article_keys: (kind, value) akışı -> uuid, published_at sıralı indeks ve makalenin o akışla ilgisi
+        kind: "symbols" / "industries", value: sembol / sektör adı
+      - streams: akış başına high-water mark (en yeni published_at), son yenileme zamanı ve
+        son tam çekimde upstream'in tükenip tükenmediği (exhausted: istenenden az makale döndü)
+      - views / usage: prefetch zamanlayıcısı için ticker görüntülenme sayıları ve günlük istek kullanımı
+      - sentiment: uuid -> duygu skoru, sözlük yoğunluğu ve skoru üreten model sürümü (makale başına bir kez)
+    """
+
+    def __init__(self, path: Path = NEWS_DB_PATH) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+
+        conn = self._conn()
+        conn.execute("PRAGMA journal_mode=WAL")
+        with conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS articles ("
+                " uuid TEXT PRIMARY KEY, published_at TEXT NOT NULL, data TEXT NOT NULL)"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS article_keys ("
+                " kind TEXT NOT NULL, value TEXT NOT NULL, uuid TEXT NOT NULL, published_at TEXT NOT NULL,"
+                " relevance REAL, PRIMARY KEY (kind, value, uuid))"
+            )
+            if "relevance" not in {row[1] for row in conn.execute("PRAGMA table_info(article_keys)")}:
+                # relevance sütunundan önce oluşturulmuş depolar: saklı makale JSON'undan bir kez doldur
+                conn.execute("ALTER TABLE article_keys ADD COLUMN relevance REAL")
+                rows = conn.execute(
+                    "SELECT k.kind, k.value, k.uuid, a.data FROM article_keys k JOIN articles a ON a.uuid = k.uuid"
+                ).fetchall()
+                conn.executemany(
+                    "UPDATE article_keys SET relevance = ? WHERE kind = ? AND value = ? AND uuid = ?",
+                    [(stream_relevance(k, v, json.loads(d)), k, v, u) for k, v, u, d in rows],
+                )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_article_keys_recent"
+                " ON article_keys (kind, value, published_at DESC)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_articles_published ON articles (published_at)")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS streams ("
+                " kind TEXT NOT NULL, value TEXT NOT NULL, watermark TEXT, refreshed_at REAL,"
+                " exhausted INTEGER NOT NULL DEFAULT 0, PRIMARY KEY (kind, value))"
+            )
+            cols = {row[1] for row in conn.execute("PRAGMA table_info(streams)")}
+            if "exhausted" not in cols:
+                # exhausted sütunundan önce oluşturulmuş depolar
+                conn.execute("ALTER TABLE streams ADD COLUMN exhausted INTEGER NOT NULL DEFAULT 0")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS views (ticker TEXT PRIMARY KEY, hits INTEGER NOT NULL, last_view REAL)"
+            )
+            conn.execute("CREATE TABLE IF NOT EXISTS usage (day TEXT PRIMARY KEY, requests INTEGER NOT NULL)")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS sentiment ("
+                " uuid TEXT PRIMARY KEY, score REAL NOT NULL, density REAL NOT NULL, hits INTEGER NOT NULL,"
+                " model TEXT NOT NULL, scored_at REAL NOT NULL)"
+            )
+            if "relevance" in {row[1] for row in conn.execute("PRAGMA table_info(sentiment)")}:
+                # eski ad: değer ticker ilgisi değil sözlük yoğunluğu; skorlar aynen geçerli
+                conn.execute("ALTER TABLE sentiment RENAME COLUMN relevance TO density")
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(str(self.path), timeout=30)
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA busy_timeout=30000")
+            self._local.conn = conn
+        return conn
+
+    def upsert(self, kind: str, value: str, items: Iterable[Dict[str, Any]]) -> int:
+        rows = []
+        keys = []
+        for it in items:
+            uid = it.get("uuid")
+            if not uid:
+                continue
+            pub = str(it.get("published_at") or "")
+            rows.append((uid, pub, json.dumps(it, ensure_ascii=False)))
+            keys.append((kind, value, uid, pub, stream_relevance(kind, value, it)))
+        if not rows:
+            return 0
+
+        conn = self._conn()
+        with conn:
+            conn.executemany("INSERT OR REPLACE INTO articles (uuid, published_at, data) VALUES (?, ?, ?)", rows)
+            conn.executemany(
+                "INSERT INTO article_keys (kind, value, uuid, published_at, relevance) VALUES (?, ?, ?, ?, ?)"
+                " ON CONFLICT (kind, value, uuid) DO UPDATE SET relevance = excluded.relevance",
+                keys,
+            )
+            newest = max(pub for _, pub, _ in rows)
+            conn.execute(
+                "INSERT INTO streams (kind, value, watermark) VALUES (?, ?, ?)"
+                " ON CONFLICT (kind, value) DO UPDATE SET watermark ="
+                " CASE WHEN streams.watermark IS NULL OR excluded.watermark > streams.watermark"
+                " THEN excluded.watermark ELSE streams.watermark END",
+                (kind, value, newest),
+            )
+        return len(rows)
+
+    def latest(self, kind: str, value: str, n: int) -> List[Dict[str, Any]]:
+        cur = self._conn().execute(
+            "SELECT a.data FROM article_keys k JOIN articles a ON a.uuid = k.uuid"
+            " WHERE k.kind = ? AND k.value = ? ORDER BY k.published_at DESC LIMIT ?",
+            (kind, value, n),
+        )
+        return [json.loads(row[0]) for row in cur]
+
+    def count(self, kind: str, value: str) -> int:
+        row = self._conn().execute(
+            "SELECT COUNT(*) FROM article_keys WHERE kind = ? AND value = ?", (kind, value)
+        ).fetchone()
+        return int(row[0])
+
+    def watermark(self, kind: str, value: str) -> Optional[str]:
+        row = self._conn().execute(
+            "SELECT watermark FROM streams WHERE kind = ? AND value = ?", (kind, value)
+        ).fetchone()
+        return row[0] if row else None
+
+    def refreshed_at(self, kind: str, value: str) -> Optional[float]:
+        row = self._conn().execute(
+            "SELECT refreshed_at FROM streams WHERE kind = ? AND value = ?", (kind, value)
+        ).fetchone()
+        return float(row[0]) if row and row[0] is not None else None
+
+    def exhausted(self, kind: str, value: str) -> bool:
+        row = self._conn().execute(
+            "SELECT exhausted FROM streams WHERE kind = ? AND value = ?", (kind, value)
+        ).fetchone()
+        return bool(row and row[0])
+
+    def mark_refreshed(
+        self, kind: str, value: str, ts: Optional[float] = None, *, exhausted: Optional[bool] = None
+    ) -> None:
+        """exhausted None ise (artımlı yenileme) önceki değer korunur."""
+        conn = self._conn()
+        with conn:
+            conn.execute(
+                "INSERT INTO streams (kind, value, refreshed_at, exhausted) VALUES (?, ?, ?, ?)"
+                " ON CONFLICT (kind, value) DO UPDATE SET refreshed_at = excluded.refreshed_at,"
+                " exhausted = CASE WHEN ? IS NULL THEN streams.exhausted ELSE excluded.exhausted END",
+                (kind, value, time.time() if ts is None else ts, int(bool(exhausted)), exhausted),
+            )
+
+    def record_view(self, ticker: str) -> None:
+        conn = self._conn()
+        with conn:
+            conn.execute(
+                "INSERT INTO views (ticker, hits, last_view) VALUES (?, 1, ?)"
+                " ON CONFLICT (ticker) DO UPDATE SET hits = views.hits + 1, last_view = excluded.last_view",
+                (ticker, time.time()),
+            )
+
+    def view_counts(self) -> Dict[str, int]:
+        return {t: int(h) for t, h in self._conn().execute("SELECT ticker, hits FROM views")}
+
+    def add_usage(self, day: str, requests: int) -> int:
+        conn = self._conn()
+        with conn:
+            conn.execute(
+                "INSERT INTO usage (day, requests) VALUES (?, ?)"
+                " ON CONFLICT (day) DO UPDATE SET requests = usage.requests + excluded.requests",
+                (day, requests),
+            )
+        return self.usage(day)
+
+    def usage(self, day: str) -> int:
+        row = self._conn().execute("SELECT requests FROM usage WHERE day = ?", (day,)).fetchone()
+        return int(row[0]) if row else 0
+
+    def unscored(self, model: str, limit: int) -> List[Dict[str, Any]]:
+        """Bu model sürümüyle henüz skorlanmamış makaleler (yeniden eskiye)."""
+        cur = self._conn().execute(
+            "SELECT a.data FROM articles a LEFT JOIN sentiment s ON s.uuid = a.uuid"
+            " WHERE s.uuid IS NULL OR s.model != ? ORDER BY a.published_at DESC LIMIT ?",
+            (model, limit),
+        )
+        return [json.loads(row[0]) for row in cur]
+
+    def put_sentiment(self, rows: Iterable[tuple], model: str) -> int:
+        """rows: (uuid, score, density, hits)"""
+        now = time.time()
+        data = [(uid, float(sc), float(dens), int(h), model, now) for uid, sc, dens, h in rows]
+        conn = self._conn()
+        with conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO sentiment (uuid, score, density, hits, model, scored_at)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                data,
+            )
+        return len(data)
+
+    def sentiment_daily(self, kind: str, value: str, since: Optional[str] = None) -> List[tuple]:
+        """
+        Akışın günlük duygu özeti: (gün, makale sayısı, ortalama skor, ağırlıklı skor, ortalama ilgi).
+        Ağırlık = makalenin akışla ilgisi (relevance, bilinmiyorsa 1) × sözlük yoğunluğu (density).
+        """
+        cur = self._conn().execute(
+            "SELECT substr(k.published_at, 1, 10) AS day, COUNT(*), AVG(s.score),"
+            " SUM(s.score * COALESCE(k.relevance, 1.0) * s.density)"
+            " / NULLIF(SUM(COALESCE(k.relevance, 1.0) * s.density), 0),"
+            " AVG(COALESCE(k.relevance, 1.0))"
+            " FROM article_keys k JOIN sentiment s ON s.uuid = k.uuid"
+            " WHERE k.kind = ? AND k.value = ? AND k.published_at >= ?"
+            " GROUP BY day ORDER BY day",
+            (kind, value, since or ""),
+        )
+        return cur.fetchall()
+
+
+_store_obj: Optional[NewsStore] = None
+_store_lock = threading.Lock()
+
+
+def get_news_store() -> NewsStore:
+    global _store_obj
+    if _store_obj is None:
+        with _store_lock:
+            if _store_obj is None:
+                _store_obj = NewsStore()
+    return _store_obj
+
+
+def set_news_store(store: Optional[NewsStore]) -> None:
+    global _store_obj
+    with _store_lock:
+        _store_obj = store
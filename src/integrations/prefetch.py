@@ -0,0 +1,156 @@
+import argparse
+import logging
+import os
+import sys
+import threading
+import time
+from typing import Dict, List, Optional
+
+from src.features.sentiment import score_new_articles
+from src.integrations.marketaux import (
+    PLAN_PAGE_LIMIT,
+    PREFETCH_INTERVAL,
+    get_ticker_and_industry_news,
+    rate_limited,
+    usage_day,
+)
+from src.integrations.news_store import get_news_store
+from src.universe import TICKERS
+
+RATE_PER_SEC = float(os.getenv("MARKETAUX_RATE_PER_SEC", "1"))
+RATE_BURST = int(os.getenv("MARKETAUX_RATE_BURST", "5"))
+DAILY_BUDGET = int(os.getenv("MARKETAUX_DAILY_BUDGET", "100"))
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBucket:
+    """Basit thread-safe token bucket: saniyede `rate` token dolar, en fazla `capacity` birikir."""
+
+    def __init__(self, rate: float, capacity: int) -> None:
+        self.rate = max(rate, 1e-9)
+        self.capacity = max(1, capacity)
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, tokens: int = 1) -> None:
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return
+                wait = (tokens - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+class PrefetchScheduler:
+    """
+    Tüm ticker evreninin haberlerini arka planda yeniler ve sonuçları haber deposuna yazar.
+    Sıra: en çok görüntülenen (hot) ticker'lar önce. Günlük istek bütçesi aşılmadan durur;
+    bütçe depodaki günlük kullanım sayacından okunur (marketaux_async._get her upstream isteğini, dashboard
+    ve entity aramaları ile retry'lar dahil, oraya yazar). Zamanlayıcının kendi istekleri token bucket'tan geçer.
+    """
+
+    def __init__(
+        self,
+        tickers: Optional[Dict[str, str]] = None,
+        *,
+        interval: float = PREFETCH_INTERVAL,
+        daily_budget: int = DAILY_BUDGET,
+        rate_per_sec: float = RATE_PER_SEC,
+        burst: int = RATE_BURST,
+        n: int = 10,
+        country: str = "us",
+    ) -> None:
+        self.tickers = dict(TICKERS if tickers is None else tickers)
+        self.interval = interval
+        self.daily_budget = daily_budget
+        self.limiter = TokenBucket(rate_per_sec, burst)
+        self.n = n
+        self.country = country
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _ordered(self) -> List[str]:
+        views = get_news_store().view_counts()
+        labels = {t: label for label, t in self.tickers.items()}
+        return sorted(labels, key=lambda t: (-views.get(t, 0), t))
+
+    def run_once(self) -> Dict[str, int]:
+        """Bir tur yeniler. Çıktı: {TICKER: yenileme sırasında günlük kullanımın artışı}"""
+        store = get_news_store()
+        labels = {t: label for label, t in self.tickers.items()}
+        # ticker + sektör akışı için tahmini en kötü durum maliyeti
+        est_cost = 2 * -(-self.n // max(1, PLAN_PAGE_LIMIT))
+
+        spent: Dict[str, int] = {}
+        with rate_limited(self.limiter):
+            for ticker in self._ordered():
+                if self._stop.is_set():
+                    break
+                day = usage_day()
+                before = store.usage(day)
+                if before + est_cost > self.daily_budget:
+                    break
+                try:
+                    get_ticker_and_industry_news(ticker, company_name=labels[ticker], country=self.country, n=self.n)
+                except Exception:
+                    # tek ticker'ın hatası turu durdurmaz; harcanan istekler yine de sayaca yazılmıştır
+                    logger.exception("Prefetch başarısız: %s", ticker)
+                spent[ticker] = store.usage(day) - before
+
+        # yeni gelen makaleleri skorla: her uuid bir kez, önceki turlarda skorlananlar atlanır
+        try:
+            score_new_articles(store)
+        except Exception:
+            logger.exception("Haber duygu skorlaması başarısız")
+        return spent
+
+    def _loop(self) -> None:
+        while not self._stop.is_set():
+            self.run_once()
+            self._stop.wait(self.interval)
+
+    def start(self) -> threading.Thread:
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._loop, name="news-prefetch", daemon=True)
+            self._thread.start()
+        return self._thread
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Marketaux haber prefetch zamanlayıcısı")
+    parser.add_argument("--interval", type=float, default=PREFETCH_INTERVAL, help="Turlar arası saniye")
+    parser.add_argument("--budget", type=int, default=DAILY_BUDGET, help="Günlük istek bütçesi")
+    parser.add_argument("--rate", type=float, default=RATE_PER_SEC, help="Saniyedeki istek sayısı")
+    parser.add_argument("--once", action="store_true", help="Tek tur çalıştır ve çık")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+
+    sched = PrefetchScheduler(interval=args.interval, daily_budget=args.budget, rate_per_sec=args.rate)
+    if args.once:
+        spent = sched.run_once()
+        print(f"Yenilenen: {len(spent)} ticker, {sum(spent.values())} istek")
+        return 0
+
+    sched.start()
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        sched.stop()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
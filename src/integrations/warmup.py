@@ -0,0 +1,41 @@
+import argparse
+import sys
+from typing import Dict, Optional
+
+from src.integrations.marketaux import resolve_entities
+from src.universe import TICKERS
+
+
+def warm_up(tickers: Optional[Dict[str, str]] = None, *, prefer_country: str = "us") -> Dict[str, bool]:
+    """
+    TICKERS evrenindeki tüm entity'leri tek geçişte çözüp entity store'a yazar.
+    Çıktı: {TICKER: çözüldü mü}
+    """
+    universe = TICKERS if tickers is None else tickers
+    names = {ticker: label for label, ticker in universe.items()}
+    resolved = resolve_entities(list(names), company_names=names, prefer_country=prefer_country)
+    return {k: v is not None for k, v in resolved.items()}
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Marketaux entity cache warm-up")
+    parser.add_argument("--country", default="us")
+    parser.add_argument("tickers", nargs="*", help="Boş bırakılırsa tüm TICKERS evreni")
+    args = parser.parse_args()
+
+    universe = TICKERS
+    if args.tickers:
+        wanted = {t.strip().upper() for t in args.tickers}
+        universe = {label: t for label, t in TICKERS.items() if t.upper() in wanted}
+        universe.update({t: t for t in wanted - {t.upper() for t in universe.values()}})
+
+    status = warm_up(universe, prefer_country=args.country)
+    missing = [k for k, ok in status.items() if not ok]
+    print(f"Çözüldü: {len(status) - len(missing)}/{len(status)}")
+    if missing:
+        print(f"Bulunamadı: {', '.join(missing)}")
+    return 1 if missing else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,34 @@
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict
+
+# hafif modül: dashboard'un okuma yolu (manifest, tahmin tablosu) sklearn/numpy yüklemeden buradan geçer
+MODEL_DIR = Path(os.getenv("MODEL_DIR", ".cache/models"))
+MANIFEST = "manifest.json"
+
+Manifest = Dict[str, Dict[str, Dict[str, Any]]]  # ticker -> vade -> artefakt kaydı
+
+
+def load_manifest(root: Path = MODEL_DIR) -> Manifest:
+    p = Path(root) / MANIFEST
+    if not p.exists():
+        return {}
+    try:
+        return json.loads(p.read_text(encoding="utf-8"))
+    except Exception:
+        return {}
+
+
+def save_manifest(manifest: Manifest, root: Path = MODEL_DIR) -> None:
+    p = Path(root) / MANIFEST
+    tmp = p.with_suffix(".tmp")
+    tmp.write_text(json.dumps(manifest, indent=2, sort_keys=True), encoding="utf-8")
+    os.replace(tmp, p)
+
+
+def load_model(path: str) -> Dict[str, Any]:
+    """Artefaktı mmap_mode='r' ile yükler: numpy dizileri süreçler arasında sayfa önbelleğinden paylaşılır."""
+    import joblib
+
+    return joblib.load(path, mmap_mode="r")
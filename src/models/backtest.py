@@ -0,0 +1,224 @@
+import argparse
+import sys
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed
+
+from src.features.engine import TRADING_DAYS, FeatureEngine
+from src.models.training import DEFAULT_CONFIG, MODEL_N_JOBS
+from src.universe import TICKERS
+
+DEFAULT_MIN_TRAIN = 252
+DEFAULT_TEST_SIZE = 63
+
+Fold = Tuple[int, int, int]  # (train_lo, train_hi, test_start); test_end = sonraki fold başı
+
+
+def _panel_arrays(engine: FeatureEngine, horizon: str) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    X: (tarih, ticker, özellik), y: h gün ileri log getiri, r1: ertesi gün log getirisi, mask: geçerli satırlar.
+    Tüm ticker'lar aynı dizide: fit/predict ticker başına döngü yerine toplu lineer cebirle yapılır.
+    """
+    h = engine.horizons[horizon]
+    feats = engine.features
+    names = list(dict.fromkeys(feats.columns.get_level_values(0)))
+    X = np.stack([feats[n].reindex(columns=engine.tickers).to_numpy(dtype="float64") for n in names], axis=2)
+    logp = np.log(engine.prices.where(engine.prices > 0)).to_numpy(dtype="float64")
+    y = np.full_like(logp, np.nan)
+    y[:-h] = logp[h:] - logp[:-h]
+    r1 = np.full_like(logp, np.nan)
+    r1[:-1] = logp[1:] - logp[:-1]
+    mask = ~np.isnan(X).any(axis=2) & ~np.isnan(y)
+    return X, y, r1, mask
+
+
+def _fit_batched(X: np.ndarray, y: np.ndarray, m: np.ndarray, alpha: float) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Her ticker için standardize edilmiş Ridge'i aynı anda çözer (training ile aynı model).
+    X: (N, T, F), y/m: (N, T). Dönüş: ham özellik ölçeğinde w (T, F) ve b (T,).
+    """
+    mf = m.astype("float64")
+    n = np.maximum(mf.sum(axis=0), 1.0)
+    X0 = np.where(m[..., None], X, 0.0)
+    y0 = np.where(m, y, 0.0)
+    mu = X0.sum(axis=0) / n[:, None]
+    sd = np.sqrt(((X0 - mu) ** 2 * mf[..., None]).sum(axis=0) / n[:, None])
+    sd = np.where(sd > 0, sd, 1.0)
+    ymu = y0.sum(axis=0) / n
+
+    Z = (X0 - mu) / sd * mf[..., None]
+    yc = (y0 - ymu) * mf
+    F = X.shape[2]
+    A = np.einsum("ntf,ntg->tfg", Z, Z) + alpha * np.eye(F)
+    rhs = np.einsum("ntf,nt->tf", Z, yc)
+    beta = np.linalg.solve(A, rhs[..., None])[..., 0]
+    w = beta / sd
+    b = ymu - np.einsum("tf,tf->t", mu, w)
+    return w, b
+
+
+def _run_fold(
+    X: np.ndarray, y: np.ndarray, mask: np.ndarray, fold: Fold, test_end: int, alpha: float, min_samples: int
+) -> Tuple[int, np.ndarray]:
+    lo, hi, start = fold
+    w, b = _fit_batched(X[lo:hi], y[lo:hi], mask[lo:hi], alpha)
+    pred = np.einsum("ntf,tf->nt", np.nan_to_num(X[start:test_end]), w) + b
+    # eğitim verisi yetersiz ticker'lar bu fold'da tahmin üretmez
+    enough = mask[lo:hi].sum(axis=0) >= min_samples
+    pred[:, ~enough] = np.nan
+    pred[np.isnan(X[start:test_end]).any(axis=2)] = np.nan
+    return start, pred
+
+
+def walk_forward_folds(
+    n_rows: int, h: int, *, mode: str, min_train: int, test_size: int, window: Optional[int]
+) -> List[Fold]:
+    """
+    Test blokları min_train'den başlayıp test_size adımla ilerler. Eğitim, test başından h gün
+    önce biter (ileri getirisi test dönemine taşan satırlar sızıntı yaratmasın diye).
+    rolling mod pozitif bir window (eğitim penceresi, satır) ister.
+    """
+    if mode not in ("expanding", "rolling"):
+        raise ValueError("mode 'expanding' veya 'rolling' olmalı")
+    if mode == "rolling" and not (window and window > 0):
+        # window'suz rolling sessizce expanding'e dönüşürdü
+        raise ValueError("rolling mod için pozitif window gerekli")
+    folds: List[Fold] = []
+    for start in range(min_train, n_rows, test_size):
+        hi = start - h
+        lo = max(0, hi - window) if mode == "rolling" else 0
+        if hi - lo > 0:
+            folds.append((lo, hi, start))
+    return folds
+
+
+def _metrics(pred: np.ndarray, y: np.ndarray, r1: np.ndarray) -> Dict[str, np.ndarray]:
+    # tüm metrikler ticker ekseninde vektörel; NaN tahmin/hedef satırları dışarıda kalır
+    scored = ~np.isnan(pred) & ~np.isnan(y)
+    err = np.where(scored, pred - y, np.nan)
+    hit = np.where(scored, np.sign(pred) == np.sign(y), np.nan)
+
+    # günlük strateji: tahminin yönünde pozisyon, ertesi gün getirisi kadar PnL
+    pos = np.sign(np.nan_to_num(pred))
+    daily = np.where(~np.isnan(pred) & ~np.isnan(r1), pos * r1, np.nan)
+    hold = np.where(~np.isnan(pred) & ~np.isnan(r1), r1, np.nan)
+    days = (~np.isnan(daily)).sum(axis=0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean, std = np.nanmean(daily, axis=0), np.nanstd(daily, axis=0)
+        return {
+            "n_predictions": scored.sum(axis=0),
+            "hit_rate": np.nanmean(hit, axis=0),
+            "mae": np.nanmean(np.abs(err), axis=0),
+            "rmse": np.sqrt(np.nanmean(err**2, axis=0)),
+            "ic": _nancorr(pred, y),
+            "pnl": np.nansum(daily, axis=0),
+            "buy_hold": np.nansum(hold, axis=0),
+            "sharpe": np.where(std > 0, mean / std * np.sqrt(TRADING_DAYS), np.nan),
+            "max_drawdown": _max_drawdown(daily),
+            "days": days,
+        }
+
+
+def _nancorr(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    ok = ~np.isnan(a) & ~np.isnan(b)
+    n = ok.sum(axis=0)
+    a0, b0 = np.where(ok, a, 0.0), np.where(ok, b, 0.0)
+    n1 = np.maximum(n, 1)
+    am, bm = a0.sum(axis=0) / n1, b0.sum(axis=0) / n1
+    ac, bc = np.where(ok, a0 - am, 0.0), np.where(ok, b0 - bm, 0.0)
+    den = np.sqrt((ac**2).sum(axis=0) * (bc**2).sum(axis=0))
+    return np.where((n > 2) & (den > 0), (ac * bc).sum(axis=0) / np.where(den > 0, den, 1.0), np.nan)
+
+
+def _max_drawdown(daily: np.ndarray) -> np.ndarray:
+    equity = np.cumsum(np.nan_to_num(daily), axis=0)
+    peak = np.maximum.accumulate(np.vstack([np.zeros((1, daily.shape[1])), equity]), axis=0)[1:]
+    return np.min(equity - peak, axis=0, initial=0.0)
+
+
+def backtest(
+    engine: FeatureEngine,
+    *,
+    mode: str = "expanding",
+    min_train: int = DEFAULT_MIN_TRAIN,
+    test_size: int = DEFAULT_TEST_SIZE,
+    window: Optional[int] = None,
+    config: Optional[Dict[str, Any]] = None,
+    n_jobs: int = MODEL_N_JOBS,
+) -> Dict[str, Any]:
+    """
+    Tüm evren ve vadeler için walk-forward değerlendirme. Fold'lar joblib ile paralel koşar;
+    her fold tüm ticker'ları tek seferde fit eder/tahminler.
+    Dönüş: {"summary": ticker × vade metrik tablosu, "predictions": {vade: tarih × ticker DataFrame}}
+    """
+    config = {**DEFAULT_CONFIG, **(config or {})}
+    alpha, min_samples = float(config["alpha"]), int(config["min_samples"])
+    index, tickers = engine.prices.index, engine.tickers
+
+    frames: List[pd.DataFrame] = []
+    predictions: Dict[str, pd.DataFrame] = {}
+    for horizon, h in engine.horizons.items():
+        X, y, r1, mask = _panel_arrays(engine, horizon)
+        folds = walk_forward_folds(len(index), h, mode=mode, min_train=min_train, test_size=test_size, window=window)
+        if not folds:
+            continue
+        ends = [f[2] for f in folds[1:]] + [len(index)]
+        parts = Parallel(n_jobs=n_jobs)(
+            delayed(_run_fold)(X, y, mask, fold, end, alpha, min_samples) for fold, end in zip(folds, ends)
+        )
+
+        pred = np.full_like(y, np.nan)
+        for start, p in parts:
+            pred[start : start + len(p)] = p
+        predictions[horizon] = pd.DataFrame(pred, index=index, columns=tickers)
+
+        m = _metrics(pred[folds[0][2] :], y[folds[0][2] :], r1[folds[0][2] :])
+        frame = pd.DataFrame(m, index=pd.Index(tickers, name="ticker"))
+        frame.insert(0, "horizon", horizon)
+        frame.insert(1, "folds", len(folds))
+        frames.append(frame.reset_index())
+
+    summary = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+    return {"summary": summary, "predictions": predictions}
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Walk-forward backtest (tüm evren, kısa/orta/uzun vade)")
+    parser.add_argument("tickers", nargs="*", help="Varsayılan: tüm evren")
+    parser.add_argument("--mode", choices=["expanding", "rolling"], default="expanding")
+    parser.add_argument("--window", type=int, default=None, help="rolling modda eğitim penceresi (gün)")
+    parser.add_argument("--min-train", type=int, default=DEFAULT_MIN_TRAIN)
+    parser.add_argument("--test-size", type=int, default=DEFAULT_TEST_SIZE)
+    parser.add_argument("--jobs", type=int, default=MODEL_N_JOBS)
+    parser.add_argument("--csv", default=None, help="Özet tabloyu CSV'ye yaz")
+    args = parser.parse_args()
+    if args.mode == "rolling" and not (args.window and args.window > 0):
+        parser.error("--mode rolling için pozitif --window gerekli")
+
+    t0 = time.perf_counter()
+    engine = FeatureEngine.from_store(args.tickers or list(TICKERS.values()))
+    res = backtest(
+        engine,
+        mode=args.mode,
+        window=args.window,
+        min_train=args.min_train,
+        test_size=args.test_size,
+        n_jobs=args.jobs,
+    )
+    summary = res["summary"]
+    if summary.empty:
+        print("Yeterli fiyat geçmişi yok.")
+        return 1
+    if args.csv:
+        summary.to_csv(args.csv, index=False)
+    cols = ["hit_rate", "mae", "rmse", "ic", "pnl", "buy_hold", "sharpe"]
+    print(summary.groupby("horizon", sort=False)[cols].mean().round(4).to_string())
+    print(f"{len(summary)} ticker×vade, {time.perf_counter() - t0:.1f} sn")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
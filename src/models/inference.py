@@ -0,0 +1,188 @@
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
+
+from src.models.artifacts import MODEL_DIR, load_manifest, load_model
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+    from src.features.engine import FeatureEngine
+
+# PredictionTable dashboard'un istek yolunda: numpy/pandas/scipy sadece batch skorlama fonksiyonlarında yüklenir
+
+PREDICTIONS_FILE = "predictions.json"
+SCENARIO_Z = 1.2816  # ayı/boğa: tahmin dağılımının %10 / %90 yüzdelikleri
+PREDICTION_COLUMNS = ["expected_return", "volatility", "confidence", "bear", "base", "bull"]
+
+
+def _linear_params(art: Dict[str, Any]) -> Optional[tuple]:
+    # StandardScaler + Ridge hattını tek (w, b) çiftine indir: y = x·w + b
+    import numpy as np
+
+    try:
+        scaler, reg = art["model"].named_steps["standardscaler"], art["model"].named_steps["ridge"]
+    except (AttributeError, KeyError):
+        return None
+    scale = np.where(scaler.scale_ == 0, 1.0, scaler.scale_)
+    w = np.asarray(reg.coef_) / scale
+    b = float(reg.intercept_) - float(np.dot(scaler.mean_, w))
+    return w, b
+
+
+def score_all(engine: FeatureEngine, *, root: Path = MODEL_DIR) -> pd.DataFrame:
+    """
+    Tüm (ticker, vade) çiftlerini son özellik satırıyla skorlar. Her vade için ticker × özellik
+    matrisi ve ticker × ağırlık matrisi kurulur; tahminler tek bir satır-içi çarpımla çıkar.
+    Çıktı: ticker, horizon + PREDICTION_COLUMNS (yüzde cinsinden).
+    """
+    import numpy as np
+    import pandas as pd
+    from scipy.special import ndtr
+
+    from src.features.engine import TRADING_DAYS
+
+    manifest = load_manifest(root)
+    latest = engine.latest()
+    rows: List[Dict[str, Any]] = []
+
+    for horizon, h in engine.horizons.items():
+        tickers, X, W, B, sigma = [], [], [], [], []
+        for ticker in engine.tickers:
+            entry = manifest.get(ticker, {}).get(horizon)
+            if not entry or ticker not in latest.index or not Path(entry["path"]).exists():
+                continue
+            art = load_model(entry["path"])
+            x = latest.loc[ticker, art["features"]].to_numpy(dtype="float64")
+            params = _linear_params(art)
+            if params is None or np.isnan(x).any():
+                continue
+            tickers.append(ticker)
+            X.append(x)
+            W.append(params[0])
+            B.append(params[1])
+            sigma.append(art["resid_std"])
+        if not tickers:
+            continue
+
+        X, W, B, sigma = np.vstack(X), np.vstack(W), np.asarray(B), np.asarray(sigma)
+        pred = np.einsum("ij,ij->i", X, W) + B  # h günlük log getiri
+        sigma = np.where(sigma > 0, sigma, np.nan)
+        realized = latest.loc[tickers, f"vol_{horizon}"].to_numpy(dtype="float64") * np.sqrt(h / TRADING_DAYS)
+
+        pct = lambda v: np.round((np.exp(v) - 1.0) * 100.0, 2)  # noqa: E731
+        frame = pd.DataFrame(
+            {
+                "ticker": tickers,
+                "horizon": horizon,
+                "expected_return": pct(pred),
+                "volatility": np.round(realized * 100.0, 2),
+                # yön doğruluğu olasılığı (normal artık varsayımı): 50..100
+                "confidence": np.round(ndtr(np.abs(pred) / sigma) * 100.0, 2),
+                "bear": pct(pred - SCENARIO_Z * sigma),
+                "base": pct(pred),
+                "bull": pct(pred + SCENARIO_Z * sigma),
+            }
+        )
+        rows.extend(frame.to_dict("records"))
+
+    return pd.DataFrame(rows, columns=["ticker", "horizon"] + PREDICTION_COLUMNS)
+
+
+def _version(manifest: Dict[str, Any], asof: str) -> str:
+    keys = sorted(f"{t}/{h}/{e['key']}" for t, hs in manifest.items() for h, e in hs.items())
+    return hashlib.sha256(json.dumps([asof, keys]).encode()).hexdigest()[:12]
+
+
+def write_table(table: pd.DataFrame, engine: FeatureEngine, *, root: Path = MODEL_DIR) -> Dict[str, Any]:
+    import numpy as np
+
+    root = Path(root)
+    asof = str(engine.prices.index[-1].date()) if len(engine.prices) else ""
+    doc = {
+        "version": _version(load_manifest(root), asof),
+        "asof": asof,
+        "generated_at": time.time(),
+        "columns": ["ticker", "horizon"] + PREDICTION_COLUMNS,
+        "rows": table.replace({np.nan: None}).to_numpy().tolist(),
+    }
+    root.mkdir(parents=True, exist_ok=True)
+    tmp = root / f"{PREDICTIONS_FILE}.tmp"
+    tmp.write_text(json.dumps(doc, separators=(",", ":")), encoding="utf-8")
+    os.replace(tmp, root / PREDICTIONS_FILE)
+    return doc
+
+
+class PredictionTable:
+    """
+    Önceden hesaplanmış tahmin tablosu. lookup() O(1) sözlük erişimidir; dosya her çağrıda sadece
+    stat edilir ve batch işi yeni bir sürüm yazdıysa tablo yeniden yüklenir.
+    """
+
+    def __init__(self, root: Path = MODEL_DIR) -> None:
+        self.path = Path(root) / PREDICTIONS_FILE
+        self.version = ""
+        self.asof = ""
+        self._rows: Dict[tuple, Dict[str, Any]] = {}
+        self._mtime = -1
+        self._lock = threading.Lock()
+
+    def _refresh(self) -> None:
+        try:
+            mtime = self.path.stat().st_mtime_ns
+        except FileNotFoundError:
+            return
+        if mtime == self._mtime:
+            return
+        with self._lock:
+            if mtime == self._mtime:
+                return
+            doc = json.loads(self.path.read_text(encoding="utf-8"))
+            cols = doc["columns"]
+            rows = {}
+            for values in doc["rows"]:
+                row = dict(zip(cols, values))
+                rows[(row["ticker"], row["horizon"])] = row
+            self._rows, self.version, self.asof, self._mtime = rows, doc.get("version", ""), doc.get("asof", ""), mtime
+
+    def lookup(self, ticker: str, horizon: str) -> Optional[Dict[str, Any]]:
+        self._refresh()
+        return self._rows.get((ticker, horizon))
+
+
+_table_obj: Optional[PredictionTable] = None
+
+
+def get_prediction_table() -> PredictionTable:
+    global _table_obj
+    if _table_obj is None:
+        _table_obj = PredictionTable()
+    return _table_obj
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Tüm evren için batch tahmin tablosu üret")
+    parser.add_argument("tickers", nargs="*", help="Varsayılan: tüm evren")
+    args = parser.parse_args()
+
+    from src.features.engine import FeatureEngine
+    from src.universe import TICKERS
+
+    t0 = time.perf_counter()
+    engine = FeatureEngine.from_store(args.tickers or list(TICKERS.values()))
+    table = score_all(engine)
+    doc = write_table(table, engine)
+    print(f"{len(table)} satır, sürüm {doc['version']} (asof {doc['asof']}), {time.perf_counter() - t0:.1f} sn")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,153 @@
+import argparse
+import hashlib
+import json
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import joblib
+import numpy as np
+import pandas as pd
+import sklearn
+from joblib import Parallel, delayed
+from sklearn.linear_model import Ridge
+from sklearn.pipeline import make_pipeline
+from sklearn.preprocessing import StandardScaler
+
+from src.features.engine import FeatureEngine
+from src.models.artifacts import MODEL_DIR, load_manifest, save_manifest
+from src.universe import TICKERS
+
+MODEL_N_JOBS = int(os.getenv("MODEL_N_JOBS", "-1"))
+
+DEFAULT_CONFIG: Dict[str, Any] = {"model": "ridge", "alpha": 1.0, "min_samples": 120}
+
+
+def _safe(ticker: str) -> str:
+    return "".join(c if c.isalnum() else "_" for c in ticker.upper()).strip("_")
+
+
+def training_sets(engine: FeatureEngine) -> Iterator[Tuple[str, str, pd.DataFrame, pd.Series]]:
+    """
+    (ticker, vade, X, y) üretir. X: o ticker'ın tüm vade özellikleri, y: h gün ileri log getiri.
+    Hedefler tüm panel için tek seferde hesaplanır; ileri getirisi henüz oluşmamış son satırlar düşer.
+    """
+    logp = np.log(engine.prices.where(engine.prices > 0))
+    targets = {name: logp.shift(-h) - logp for name, h in engine.horizons.items()}
+    for ticker in engine.tickers:
+        X = engine.features.xs(ticker, axis=1, level=1)
+        valid_x = X.notna().all(axis=1)
+        for name in engine.horizons:
+            y = targets[name][ticker]
+            mask = valid_x & y.notna()
+            yield ticker, name, X[mask], y[mask]
+
+
+def model_key(X: pd.DataFrame, y: pd.Series, config: Dict[str, Any]) -> str:
+    """Veri + konfigürasyon + sklearn sürümü içerik özeti; aynıysa yeniden eğitim atlanır."""
+    h = hashlib.sha256()
+    h.update(json.dumps({"config": config, "sklearn": sklearn.__version__, "cols": list(X.columns)}, sort_keys=True).encode())
+    h.update(X.index.values.astype("datetime64[ns]").view("int64").tobytes())
+    h.update(np.ascontiguousarray(X.to_numpy(dtype="float64")).tobytes())
+    h.update(np.ascontiguousarray(y.to_numpy(dtype="float64")).tobytes())
+    return h.hexdigest()[:20]
+
+
+def _fit(X: np.ndarray, y: np.ndarray, config: Dict[str, Any]) -> Dict[str, Any]:
+    model = make_pipeline(StandardScaler(), Ridge(alpha=float(config.get("alpha", 1.0))))
+    model.fit(X, y)
+    resid = y - model.predict(X)
+    return {
+        "model": model,
+        "resid_std": float(np.std(resid)),
+        "r2": float(model.score(X, y)),
+        "n_samples": int(len(y)),
+    }
+
+
+def _train_one(
+    ticker: str, horizon: str, key: str, X: np.ndarray, y: np.ndarray, columns: List[str], path: str, config: Dict[str, Any]
+) -> Dict[str, Any]:
+    t0 = time.perf_counter()
+    art = _fit(X, y, config)
+    art.update({"ticker": ticker, "horizon": horizon, "key": key, "features": columns, "config": config})
+    # sıkıştırmasız kaydet: mmap_mode ile yüklenebilsin
+    tmp = f"{path}.tmp"
+    joblib.dump(art, tmp)
+    os.replace(tmp, path)
+    meta = {k: art[k] for k in ("key", "resid_std", "r2", "n_samples")}
+    meta.update({"path": path, "trained_at": time.time(), "fit_s": round(time.perf_counter() - t0, 4)})
+    return {"ticker": ticker, "horizon": horizon, **meta}
+
+
+def train_all(
+    engine: FeatureEngine,
+    *,
+    config: Optional[Dict[str, Any]] = None,
+    root: Path = MODEL_DIR,
+    n_jobs: int = MODEL_N_JOBS,
+    force: bool = False,
+) -> Dict[str, Any]:
+    """
+    Her (ticker, vade) için model eğitir. İçerik anahtarı değişmemiş ve artefaktı diskte olan
+    işler atlanır; kalanlar joblib.Parallel ile çekirdeklere dağıtılır.
+    Dönüş: {"trained", "skipped", "insufficient", "manifest"}
+    """
+    config = {**DEFAULT_CONFIG, **(config or {})}
+    root = Path(root)
+    manifest = load_manifest(root)
+
+    jobs = []
+    skipped = insufficient = 0
+    for ticker, horizon, X, y in training_sets(engine):
+        if len(y) < int(config["min_samples"]):
+            insufficient += 1
+            continue
+        key = model_key(X, y, config)
+        d = root / _safe(ticker)
+        path = d / f"{horizon}-{key}.joblib"
+        prev = manifest.get(ticker, {}).get(horizon, {})
+        if not force and prev.get("key") == key and path.exists():
+            skipped += 1
+            continue
+        d.mkdir(parents=True, exist_ok=True)
+        args = (ticker, horizon, key, X.to_numpy(dtype="float64"), y.to_numpy(dtype="float64"), list(X.columns))
+        jobs.append(delayed(_train_one)(*args, str(path), config))
+
+    results = Parallel(n_jobs=n_jobs)(jobs) if jobs else []
+    for res in results:
+        entry = manifest.setdefault(res.pop("ticker"), {})
+        old = entry.get(res["horizon"], {}).get("path")
+        entry[res.pop("horizon")] = res
+        if old and old != res["path"]:
+            Path(old).unlink(missing_ok=True)
+    if results:
+        root.mkdir(parents=True, exist_ok=True)
+        save_manifest(manifest, root)
+
+    return {"trained": len(results), "skipped": skipped, "insufficient": insufficient, "manifest": manifest}
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Ticker × vade model eğitimi (paralel, içerik anahtarlı)")
+    parser.add_argument("tickers", nargs="*", help="Varsayılan: tüm evren")
+    parser.add_argument("--jobs", type=int, default=MODEL_N_JOBS)
+    parser.add_argument("--alpha", type=float, default=DEFAULT_CONFIG["alpha"])
+    parser.add_argument("--force", action="store_true", help="Anahtar aynı olsa da yeniden eğit")
+    args = parser.parse_args()
+
+    tickers = args.tickers or list(TICKERS.values())
+    t0 = time.perf_counter()
+    engine = FeatureEngine.from_store(tickers)
+    res = train_all(engine, config={"alpha": args.alpha}, n_jobs=args.jobs, force=args.force)
+    print(
+        f"{res['trained']} eğitildi, {res['skipped']} atlandı (değişiklik yok), "
+        f"{res['insufficient']} yetersiz veri, {time.perf_counter() - t0:.1f} sn"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,152 @@
+from __future__ import annotations
+
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+
+import pandas as pd
+
+from src.reports.news_prompt import _CTRL_RE, DEFAULT_MAX_ITEMS, DEFAULT_MAX_SNIPPET_CHARS, _clean_text
+
+# uzun format: her satır bir makale; stream "ticker" veya "industry"
+NEWS_COLUMNS = ["symbol", "industry", "stream", "title", "description", "snippet", "url", "source", "published_at"]
+
+_LABELS = {"ticker": "Şirket Haberi", "industry": "Sektör Haberi"}
+_ISO_MINUTE_RE = r"^(\d{4}-\d{2}-\d{2})[T ](\d{2}:\d{2})"
+
+
+def news_records(results: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """get_ticker_and_industry_news çıktılarını uzun formatlı kayıtlara düzleştirir."""
+    rows: List[Dict[str, Any]] = []
+    for res in results:
+        sym = res.get("symbol", "")
+        ind = res.get("industry", "")
+        for stream, key in (("ticker", "ticker_news"), ("industry", "industry_news")):
+            for it in res.get(key) or []:
+                row = {"symbol": sym, "industry": ind, "stream": stream}
+                row.update({c: it.get(c) for c in NEWS_COLUMNS[3:]})
+                rows.append(row)
+    return rows
+
+
+def _clean(s: pd.Series) -> pd.Series:
+    # news_prompt._clean_text'in vektörel karşılığı
+    s = s.fillna("").astype(str)
+    s = s.str.replace(_CTRL_RE, " ", regex=True)
+    s = s.str.replace("\u200b", " ", regex=False).str.replace("\ufeff", " ", regex=False)
+    return s.str.replace(r"\s+", " ", regex=True).str.strip()
+
+
+def _truncate(s: pd.Series, max_chars: int) -> pd.Series:
+    if max_chars <= 0:
+        return pd.Series("", index=s.index)
+    long = s.str.len() > max_chars
+    return s.where(~long, s.str[: max_chars - 1].str.rstrip() + "…")
+
+
+def _fmt_dt(s: pd.Series) -> pd.Series:
+    # ISO zaman damgasını "YYYY-MM-DD HH:MM" yap; ayrıştırılamayanlar temizlenmiş haliyle kalır
+    parts = s.str.extract(_ISO_MINUTE_RE)
+    out = parts[0] + " " + parts[1]
+    valid = pd.to_datetime(out, format="%Y-%m-%d %H:%M", errors="coerce").notna()
+    return out.where(valid, s)
+
+
+def _join_nonempty(a: pd.Series, b: pd.Series, sep: str) -> pd.Series:
+    # boş parçaları atlayarak birleştir: "a{sep}b", "a", "b" veya ""
+    out = (a + sep + b).where(b != "", a)
+    return out.where(a != "", b)
+
+
+def _render_frame(
+    df: pd.DataFrame,
+    industries: Dict[str, str],
+    include_url: bool,
+    max_items: int,
+    max_snippet_chars: int,
+) -> Dict[str, Tuple[str, str]]:
+    df = df.reindex(columns=NEWS_COLUMNS)
+    symbol = _clean(df["symbol"])
+    stream = df["stream"].fillna("ticker").astype(str)
+    url = _clean(df["url"])
+    title = _clean(df["title"])
+
+    # aynı url/title tekrarlarını azalt (akış başına ilk max_items benzersiz makale)
+    key = url.where(url != "", title).str.lower()
+    keep = (key != "") & ~pd.DataFrame({"s": symbol, "t": stream, "k": key}).duplicated()
+    df, symbol, stream, url, title = df[keep], symbol[keep], stream[keep], url[keep], title[keep]
+    rank = pd.DataFrame({"s": symbol, "t": stream}).groupby(["s", "t"], sort=False).cumcount()
+    keep = rank < max_items
+    df, symbol, stream, url, title, rank = df[keep], symbol[keep], stream[keep], url[keep], title[keep], rank[keep]
+
+    published = _fmt_dt(_clean(df["published_at"]))
+    source = _clean(df["source"])
+    desc = _clean(df["description"])
+    content = _truncate(desc.where(desc != "", _clean(df["snippet"])), max_snippet_chars)
+
+    label = stream.map(_LABELS).fillna(_LABELS["ticker"])
+    header = ((rank + 1).astype(str) + ". " + label + ": " + title).str.strip()
+    meta = _join_nonempty(published, source, ", ")
+    header = header.where(meta == "", header + " (" + meta + ")")
+    block = _join_nonempty(header, content, "\n")
+    if include_url:
+        block = _join_nonempty(block, url, "\n")
+    block = block.str.strip()
+
+    sections = (
+        pd.DataFrame({"s": symbol, "t": stream, "b": block})
+        .groupby(["s", "t"], sort=False)["b"]
+        .agg("\n\n".join)
+    )
+
+    row_ind = _clean(df["industry"])
+    for sym, ind in zip(symbol, row_ind):
+        if ind and not industries.get(sym):
+            industries[sym] = ind
+
+    out: Dict[str, Tuple[str, str]] = {}
+    for sym in dict.fromkeys(list(industries) + list(symbol)):
+        ind = industries.get(sym, "")
+        t_body = sections.get((sym, "ticker"), "") or "Yok."
+        i_body = sections.get((sym, "industry"), "") or "Yok."
+        t_head = (f"SYMBOL: {sym}\n" if sym else "") + "Şirket Haberleri:"
+        i_head = (f"INDUSTRY: {ind}\n" if ind else "") + "Sektör Haberleri:"
+        out[sym] = (f"{t_head}\n{t_body}", f"{i_head}\n{i_body}")
+    return out
+
+
+def build_llm_contexts(
+    news: Union[pd.DataFrame, Iterable[Dict[str, Any]]],
+    *,
+    industries: Optional[Dict[str, str]] = None,
+    include_url: bool = True,
+    max_items: int = DEFAULT_MAX_ITEMS,
+    max_snippet_chars: int = DEFAULT_MAX_SNIPPET_CHARS,
+    processes: Optional[int] = None,
+) -> Dict[str, Tuple[str, str]]:
+    """
+    Birden çok sembolün haber bağlamını tek geçişte üretir (build_llm_context'in toplu sürümü).
+    Girdi: NEWS_COLUMNS kolonlu uzun formatlı DataFrame veya kayıtlar (bkz. news_records).
+    industries: {SYMBOL: industry}; haberi hiç olmayan semboller de "Yok." bağlamıyla döner.
+    processes > 1 ise semboller process havuzuna bölünür.
+    Çıktı: {SYMBOL: (ticker_context, industry_context)}
+    """
+    df = news if isinstance(news, pd.DataFrame) else pd.DataFrame(list(news), columns=NEWS_COLUMNS)
+    inds = {_clean_text(str(k)): _clean_text(str(v or "")) for k, v in (industries or {}).items()}
+    args = (include_url, max_items, max_snippet_chars)
+
+    if not processes or processes <= 1 or df.empty:
+        return _render_frame(df, inds, *args)
+
+    sym_col = _clean(df["symbol"])
+    symbols = list(dict.fromkeys(list(inds) + sym_col.tolist()))
+    n = min(processes, len(symbols))
+    groups = [symbols[i::n] for i in range(n)]
+
+    out: Dict[str, Tuple[str, str]] = {}
+    with ProcessPoolExecutor(max_workers=n) as ex:
+        futs = [
+            ex.submit(_render_frame, df[sym_col.isin(g)], {s: inds.get(s, "") for s in g}, *args) for g in groups
+        ]
+        for fut in futs:
+            out.update(fut.result())
+    return {s: out[s] for s in symbols if s in out}
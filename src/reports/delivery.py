@@ -0,0 +1,136 @@
+import os
+import queue
+import smtplib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from email.message import EmailMessage
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+SMTP_HOST = os.getenv("SMTP_HOST", "localhost")
+SMTP_PORT = int(os.getenv("SMTP_PORT", "25"))
+SMTP_USER = os.getenv("SMTP_USER", "")
+SMTP_PASSWORD = os.getenv("SMTP_PASSWORD", "")
+SMTP_STARTTLS = os.getenv("SMTP_STARTTLS", "false").lower() in ("1", "true", "yes")
+SMTP_TIMEOUT = float(os.getenv("SMTP_TIMEOUT", "30"))
+SMTP_POOL_SIZE = int(os.getenv("SMTP_POOL_SIZE", "4"))
+REPORT_FROM = os.getenv("REPORT_FROM", "FinAnalytics <reports@localhost>")
+
+
+class SmtpPool:
+    """
+    Sınırlı SMTP bağlantı havuzu. En fazla `size` bağlantı açılır; boşa çıkan bağlantılar
+    sonraki gönderimlerde yeniden kullanılır (her mail için EHLO/STARTTLS/AUTH tekrarlanmaz).
+    Sunucunun kapattığı boştaki bağlantılar gönderim anında bir kez yeniden kurulur.
+    """
+
+    def __init__(
+        self,
+        host: str = SMTP_HOST,
+        port: int = SMTP_PORT,
+        *,
+        user: str = SMTP_USER,
+        password: str = SMTP_PASSWORD,
+        starttls: bool = SMTP_STARTTLS,
+        size: int = SMTP_POOL_SIZE,
+        timeout: float = SMTP_TIMEOUT,
+    ) -> None:
+        self.host, self.port = host, port
+        self.user, self.password, self.starttls = user, password, starttls
+        self.size, self.timeout = max(1, size), timeout
+        self._idle: "queue.LifoQueue[smtplib.SMTP]" = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(self.size)
+        self.connects = 0
+
+    def _connect(self) -> smtplib.SMTP:
+        conn = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        if self.starttls:
+            conn.starttls()
+        if self.user:
+            conn.login(self.user, self.password)
+        self.connects += 1
+        return conn
+
+    @staticmethod
+    def _discard(conn: smtplib.SMTP) -> None:
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    @contextmanager
+    def connection(self) -> Iterator[smtplib.SMTP]:
+        with self._slots:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                conn = self._connect()
+            try:
+                yield conn
+            except Exception:
+                self._discard(conn)
+                raise
+            self._idle.put(conn)
+
+    def send(self, msg: EmailMessage) -> None:
+        try:
+            with self.connection() as conn:
+                conn.send_message(msg)
+        except smtplib.SMTPServerDisconnected:
+            # boşta beklerken sunucu tarafından kapatılmış bağlantı: yeni bağlantıyla bir kez dene
+            with self.connection() as conn:
+                conn.send_message(msg)
+
+    def close(self) -> None:
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                return
+            try:
+                conn.quit()
+            except Exception:
+                self._discard(conn)
+
+    def __enter__(self) -> "SmtpPool":
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+
+def make_message(to: str, subject: str, body: str, sender: str = REPORT_FROM) -> EmailMessage:
+    msg = EmailMessage()
+    msg["From"] = sender
+    msg["To"] = to
+    msg["Subject"] = subject
+    msg.set_content(body)
+    return msg
+
+
+def deliver(
+    messages: Iterable[EmailMessage], pool: Optional[SmtpPool] = None, *, workers: Optional[int] = None
+) -> Dict[str, List]:
+    """
+    Mesajları havuz boyutu kadar worker ile gönderir.
+    Dönüş: {"sent": [mesaj, ...], "failed": [(mesaj, hata), ...]}
+    """
+    own = pool is None
+    pool = pool or SmtpPool()
+    sent: List[EmailMessage] = []
+    failed: List[Tuple[EmailMessage, str]] = []
+
+    def _one(msg: EmailMessage) -> None:
+        try:
+            pool.send(msg)
+            sent.append(msg)
+        except Exception as e:
+            failed.append((msg, repr(e)))
+
+    try:
+        with ThreadPoolExecutor(max_workers=workers or pool.size, thread_name_prefix="smtp") as ex:
+            list(ex.map(_one, messages))
+    finally:
+        if own:
+            pool.close()
+    return {"sent": sent, "failed": failed}
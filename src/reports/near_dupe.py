@@ -0,0 +1,136 @@
+from __future__ import annotations
+
+import hashlib
+import re
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+SIMHASH_BITS = 64
+# Eşik ve shingle boyu gerçekçi sendikasyon varyantlarıyla (kaynak son eki, "UPDATE 1-" öneki, dateline,
+# 120-150 karaktere kırpma, bir-iki kelime değişikliği) ölçüldü; tests/test_near_dupe.py bu değerleri sabitler.
+# Normalize edilmiş başlık + açıklamanın ilk 150 karakteri, 2-gram'larla: varyantlar <= 14 bit, aynı şirketin
+# farklı (hatta şablonu benzer) haberleri >= 18 bit.
+DEFAULT_MAX_DISTANCE = 15
+DEFAULT_SHINGLE_SIZE = 2
+DEFAULT_TEXT_CHARS = 400
+DEDUPE_TEXT_CHARS = 150  # kırpılmış kopyalar (snippet) da aynı öneki paylaşsın diye kısa tutulur
+
+_WORD_RE = re.compile(r"[^\W_]+", re.UNICODE)
+
+# ajans/sendikasyon kalıpları: parmak izinden önce atılır
+_SOURCES = r"(?:Reuters|Bloomberg|AP|AFP|Dow Jones|MarketWatch|CNBC|Barron's|WSJ|Yahoo Finance)"
+_TITLE_PREFIX_RE = re.compile(
+    r"^(?:(?:UPDATE\s*\d*|EXCLUSIVE|CORRECTED|REFILE|RPT|BREAKINGVIEWS|WRAPUP\s*\d*)\s*[-:]\s*)+", re.IGNORECASE
+)
+_TITLE_SUFFIX_RE = re.compile(r"\s+[-|–—]\s+" + _SOURCES + r"\s*$", re.IGNORECASE)
+# "ATLANTA (Reuters) - ", "NEW YORK, Oct 14 (Reuters) - ", "(Bloomberg) -- "
+_DATELINE_RE = re.compile(
+    r"^(?:[A-Z][A-Za-z .'-]{0,40}(?:,\s*\w+\.?\s*\d{1,2})?\s*)?\(" + _SOURCES + r"\)\s*(?:[-–—]{1,2}\s*)?"
+)
+
+# bit sayaçları tek bir büyük int içinde LANE_BITS genişlikli şeritlerde tutulur; her baytın
+# şeritlere yayılmış hali önceden hesaplanır, böylece shingle başına 64 yerine 8 işlem yapılır
+LANE_BITS = 20
+_LANE_MASK = (1 << LANE_BITS) - 1
+_SPREAD = [
+    [sum(1 << ((i * 8 + j) * LANE_BITS) for j in range(8) if (v >> j) & 1) for v in range(256)] for i in range(8)
+]
+
+
+def _shingles(text: str, k: int = DEFAULT_SHINGLE_SIZE) -> List[str]:
+    words = _WORD_RE.findall(text.lower())
+    if len(words) <= k:
+        return [" ".join(words)] if words else []
+    return [" ".join(words[i : i + k]) for i in range(len(words) - k + 1)]
+
+
+def simhash(text: str, *, k: int = DEFAULT_SHINGLE_SIZE) -> int:
+    """Kelime k-gram'ları üzerinden 64 bit SimHash parmak izi."""
+    acc = 0
+    n = 0
+    for sh in _shingles(text, k):
+        digest = hashlib.blake2b(sh.encode("utf-8"), digest_size=8).digest()
+        for i, byte in enumerate(digest):
+            acc += _SPREAD[i][byte]
+        n += 1
+
+    # bit b, shingle'ların yarısından fazlasında 1 ise parmak izinde 1 olur
+    out = 0
+    for b in range(SIMHASH_BITS):
+        if 2 * ((acc >> (b * LANE_BITS)) & _LANE_MASK) > n:
+            out |= 1 << b
+    return out
+
+
+def article_text(it: Dict[str, Any], max_chars: int = DEFAULT_TEXT_CHARS) -> str:
+    # başlık + açıklamanın başı: sendikasyon kopyalarında en kararlı kısım
+    title = str(it.get("title") or "").strip()
+    body = str(it.get("description") or it.get("snippet") or "").strip()
+    return f"{title} {body[:max_chars]}".strip()
+
+
+def dedupe_text(it: Dict[str, Any], max_chars: int = DEDUPE_TEXT_CHARS) -> str:
+    """Yakın kopya karşılaştırma metni: ajans önek/son ekleri ve dateline'sız başlık + açıklamanın başı."""
+    title = _TITLE_SUFFIX_RE.sub("", _TITLE_PREFIX_RE.sub("", str(it.get("title") or "").strip()))
+    body = _DATELINE_RE.sub("", str(it.get("description") or it.get("snippet") or "").strip())
+    return f"{title} {body[:max_chars]}".strip()
+
+
+class NearDupIndex:
+    """
+    SimHash + LSH bant indeksi. 64 bit parmak izi max_distance+1 banda bölünür; Hamming mesafesi
+    max_distance'ı aşmayan iki parmak izi güvercin yuvası ilkesiyle en az bir bantta birebir eşleşir,
+    bu yüzden aday arama tüm indeksi taramaz. Ticker ve sektör akışları arasında paylaşılabilir.
+    Varsayılan eşikte bantlar 4 bitlik: bağlam başına birkaç on makalede aday kümesi indeksin büyük kısmı olur,
+    doğrulama tek popcount olduğu için bu sorun değil; güvercin yuvası garantisi (kaçırmama) korunur.
+    """
+
+    def __init__(self, max_distance: int = DEFAULT_MAX_DISTANCE) -> None:
+        self.max_distance = max_distance
+        self.bands = max_distance + 1
+        # 64 biti bantlara eşit böl (artan bitler ilk bantlara): her bant (kaydırma, maske)
+        base, extra = divmod(SIMHASH_BITS, self.bands)
+        self._slices: List[Tuple[int, int]] = []
+        shift = 0
+        for i in range(self.bands):
+            width = base + (1 if i < extra else 0)
+            self._slices.append((shift, (1 << width) - 1))
+            shift += width
+        self._tables: List[Dict[int, List[Tuple[int, Any]]]] = [{} for _ in range(self.bands)]
+        self.size = 0
+
+    def _keys(self, fp: int) -> Iterable[Tuple[int, int]]:
+        for i, (shift, mask) in enumerate(self._slices):
+            yield i, (fp >> shift) & mask
+
+    def find(self, fp: int) -> Optional[Any]:
+        for i, key in self._keys(fp):
+            for other, ref in self._tables[i].get(key, ()):
+                if bin(fp ^ other).count("1") <= self.max_distance:
+                    return ref
+        return None
+
+    def add(self, fp: int, ref: Any = None) -> None:
+        for i, key in self._keys(fp):
+            self._tables[i].setdefault(key, []).append((fp, ref))
+        self.size += 1
+
+    @staticmethod
+    def fingerprint(it: Dict[str, Any]) -> Optional[int]:
+        """Makalenin parmak izi; metni olmayan makale için None (hiçbir şeyin kopyası sayılmaz)."""
+        text = dedupe_text(it)
+        return simhash(text) if text else None
+
+    def is_duplicate(self, fp: Optional[int]) -> bool:
+        return fp is not None and self.find(fp) is not None
+
+    def add_article(self, it: Dict[str, Any], fp: Optional[int]) -> None:
+        if fp is not None:
+            self.add(fp, it.get("uuid") or it.get("url") or article_text(it)[:80])
+
+    def check_and_add(self, it: Dict[str, Any]) -> bool:
+        """Makale daha önce eklenenlerin yakın kopyası değilse ekler ve True döner."""
+        fp = self.fingerprint(it)
+        if self.is_duplicate(fp):
+            return False
+        self.add_article(it, fp)
+        return True
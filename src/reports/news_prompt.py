@@ -1,12 +1,25 @@
 from __future__ import annotations
 
+import os
 import re
+import sys
+import threading
+from collections import OrderedDict
 from datetime import datetime
-from typing import Any, Dict, List, Tuple
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from src.reports.near_dupe import NearDupIndex
 
 
 DEFAULT_MAX_ITEMS = 10
 DEFAULT_MAX_SNIPPET_CHARS = 500
+DEFAULT_TICKER_SHARE = 0.6
+CHARS_PER_TOKEN = 4  # kaba tahmin: İngilizce haber metni için ~4 karakter/token
+
+# render memo'ları: makale bloğu ve tüm bağlam için boyut ve tahliye politikası (lru / fifo)
+ITEM_CACHE_SIZE = int(os.getenv("NEWS_PROMPT_ITEM_CACHE_SIZE", "4096"))
+CONTEXT_CACHE_SIZE = int(os.getenv("NEWS_PROMPT_CONTEXT_CACHE_SIZE", "256"))
+CACHE_POLICY = os.getenv("NEWS_PROMPT_CACHE_POLICY", "lru").strip().lower()
 
 
 _WS_RE = re.compile(r"\s+")
@@ -50,14 +63,88 @@ def _pick_content(it: Dict[str, Any], max_snippet_chars: int) -> str:
     return _truncate(content, max_snippet_chars)
 
 
-def _format_item(
+class _Memo:
+    """Thread-safe, sınırlı boyutlu memo. policy="lru" okumada tazeler, "fifo" eklenme sırasıyla tahliye eder."""
+
+    def __init__(self, maxsize: int, policy: str = "lru") -> None:
+        if policy not in ("lru", "fifo"):
+            raise ValueError(f"Bilinmeyen cache politikası: {policy} (lru/fifo)")
+        self.maxsize = maxsize
+        self.policy = policy
+        self.hits = 0
+        self.misses = 0
+        self._data: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Any) -> Optional[Any]:
+        with self._lock:
+            val = self._data.get(key)
+            if val is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            if self.policy == "lru":
+                self._data.move_to_end(key)
+            return val
+
+    def put(self, key: Any, val: Any) -> None:
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._data[key] = val
+            if self.policy == "lru":
+                self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def info(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "policy": self.policy,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+_item_memo = _Memo(ITEM_CACHE_SIZE, CACHE_POLICY)
+_context_memo = _Memo(CONTEXT_CACHE_SIZE, CACHE_POLICY)
+
+
+def configure_context_cache(
+    *,
+    item_maxsize: Optional[int] = None,
+    context_maxsize: Optional[int] = None,
+    policy: Optional[str] = None,
+) -> None:
+    """Memo boyutlarını/politikasını değiştirir; mevcut içerik temizlenir."""
+    global _item_memo, _context_memo
+    _item_memo = _Memo(_item_memo.maxsize if item_maxsize is None else item_maxsize, policy or _item_memo.policy)
+    _context_memo = _Memo(
+        _context_memo.maxsize if context_maxsize is None else context_maxsize, policy or _context_memo.policy
+    )
+
+
+def context_cache_info() -> Dict[str, Dict[str, Any]]:
+    return {"items": _item_memo.info(), "contexts": _context_memo.info()}
+
+
+def _format_body(
     it: Dict[str, Any],
     *,
-    idx: int,
     label: str,
     include_url: bool,
     max_snippet_chars: int,
 ) -> str:
+    # sıra numarası hariç blok: aynı makale farklı sırada da görünse memo'dan kullanılabilir
+    uid = it.get("uuid")
+    key = (uid, label, include_url, max_snippet_chars) if uid else None
+    if key is not None:
+        cached = _item_memo.get(key)
+        if cached is not None:
+            return cached
+
     title = _clean_text(str(it.get("title") or ""))
     published_at = _fmt_dt(str(it.get("published_at") or ""))
     source = _clean_text(str(it.get("source") or ""))
@@ -66,8 +153,8 @@ def _format_item(
     meta_parts = [p for p in [published_at, source] if p]
     meta = ", ".join(meta_parts)
 
-    # 1. Şirket Haberi: Başlık, Tarih/Kaynak
-    header = f"{idx}. {label}: {title}".strip()
+    # (1.) Şirket Haberi: Başlık, Tarih/Kaynak
+    header = f"{label}: {title}".strip()
     if meta:
         header = f"{header} ({meta})"
 
@@ -79,7 +166,139 @@ def _format_item(
     if include_url and url:
         parts.append(url)
 
-    return "\n".join(parts).strip()
+    body = "\n".join(parts).strip()
+    if key is not None:
+        _item_memo.put(key, body)
+    return body
+
+
+def _format_item(
+    it: Dict[str, Any],
+    *,
+    idx: int,
+    label: str,
+    include_url: bool,
+    max_snippet_chars: int,
+) -> str:
+    return f"{idx}. " + _format_body(it, label=label, include_url=include_url, max_snippet_chars=max_snippet_chars)
+
+
+def _dedupe_key(it: Dict[str, Any]) -> str:
+    return (_clean_text(str(it.get("url") or "")) or _clean_text(str(it.get("title") or ""))).lower()
+
+
+def _candidates(
+    items: Iterable[Dict[str, Any]], dedupe_index: Optional[NearDupIndex]
+) -> Iterator[Tuple[Dict[str, Any], Optional[int]]]:
+    # aynı url/title tekrarlarını azalt; yakın kopya sadece kontrol edilir, indekse eklemek tüketicinin işi
+    seen = set()
+    for it in items or []:
+        key = _dedupe_key(it)
+        if not key or key in seen:
+            continue
+        seen.add(key)
+        fp = None
+        if dedupe_index is not None:
+            fp = dedupe_index.fingerprint(it)
+            if dedupe_index.is_duplicate(fp):
+                continue
+        yield it, fp
+
+
+def iter_context_items(
+    items: Iterable[Dict[str, Any]],
+    *,
+    label: str,
+    include_url: bool = True,
+    max_items: int = DEFAULT_MAX_ITEMS,
+    max_snippet_chars: int = DEFAULT_MAX_SNIPPET_CHARS,
+    dedupe_index: Optional[NearDupIndex] = None,
+) -> Iterator[str]:
+    """
+    Haberleri tembel olarak tekilleştirip biçimlendirir; her adımda bir blok üretir.
+    Tüketici durduğunda kalan makaleler hiç temizlenmez/biçimlendirilmez.
+    dedupe_index verilirse daha önce indekse girmiş makalelerin yakın kopyaları da atlanır;
+    üretilen her blok tüketilmiş sayılır ve indekse eklenir.
+    """
+    idx = 0
+    for it, fp in _candidates(items, dedupe_index):
+        if idx >= max_items:
+            return
+        if dedupe_index is not None:
+            dedupe_index.add_article(it, fp)
+        idx += 1
+        yield _format_item(
+            it,
+            idx=idx,
+            label=label,
+            include_url=include_url,
+            max_snippet_chars=max_snippet_chars,
+        )
+
+
+_EMPTY = "\nYok."
+
+
+class _Section:
+    """
+    Bütçeli bağlam bölümü: adayları bütçe izin verdikçe çeker, sığmayanı bekletir.
+    Yakın kopya indeksine sadece gerçekten alınan bloklar eklenir; bekleyen blok, bu arada diğer
+    bölüm yakın kopyasını aldıysa alınmadan atlanır.
+    """
+
+    def __init__(
+        self,
+        header: str,
+        candidates: Iterator[Tuple[Dict[str, Any], Optional[int]]],
+        fmt: Callable[[Dict[str, Any], int], str],
+        *,
+        max_items: int,
+        dedupe_index: Optional[NearDupIndex] = None,
+    ) -> None:
+        self.header = header
+        self.candidates = candidates
+        self.fmt = fmt
+        self.max_items = max_items
+        self.dedupe_index = dedupe_index
+        self.taken: List[str] = []
+        self.pending: Optional[Tuple[str, Dict[str, Any], Optional[int]]] = None
+        self.exhausted = False
+        # boş bölüm "Yok." ile render edilir; ilk blok gelince bu yer geri kazanılır
+        self.used = len(header) + len(_EMPTY)
+
+    def fill(self, limit: int) -> None:
+        while self.used < limit:
+            if len(self.taken) >= self.max_items:
+                self.exhausted = True
+                return
+            if self.pending is None:
+                nxt = next(self.candidates, None)
+                if nxt is None:
+                    self.exhausted = True
+                    return
+                it, fp = nxt
+                self.pending = (self.fmt(it, len(self.taken) + 1), it, fp)
+            block, it, fp = self.pending
+            if self.dedupe_index is not None and self.dedupe_index.is_duplicate(fp):
+                self.pending = None
+                continue
+            cost = len(block) + 2 if self.taken else len(block) + 1 - len(_EMPTY)  # "\n\n" / "\n" ayırıcı
+            if self.used + cost > limit:
+                return
+            self.pending = None
+            self.taken.append(block)
+            self.used += cost
+            if self.dedupe_index is not None:
+                self.dedupe_index.add_article(it, fp)
+
+    def render(self) -> str:
+        if not self.taken:
+            return f"{self.header}{_EMPTY}".strip()
+        return f"{self.header}\n" + "\n\n".join(self.taken)
+
+
+def _header(tag: str, value: str, title: str) -> str:
+    return "\n".join(([f"{tag}: {value}"] if value else []) + [title])
 
 
 def build_llm_context(
@@ -91,74 +310,89 @@ def build_llm_context(
     include_url: bool = True,
     max_items: int = DEFAULT_MAX_ITEMS,
     max_snippet_chars: int = DEFAULT_MAX_SNIPPET_CHARS,
+    budget_chars: Optional[int] = None,
+    budget_tokens: Optional[int] = None,
+    ticker_share: float = DEFAULT_TICKER_SHARE,
+    near_dupe: bool = False,
+    dedupe_index: Optional[NearDupIndex] = None,
 ) -> Tuple[str, str]:
     """
     Çıktı:
       - ticker_context: LLM'e verilecek şirket haber bağlamı (son max_items)
       - industry_context: LLM'e verilecek sektör haber bağlamı (son max_items)
+
+    budget_chars / budget_tokens verilirse iki bağlamın toplam uzunluğu bu bütçeyi aşmaz
+    (token ≈ CHARS_PER_TOKEN karakter). Şirket bölümü önceliklidir: önce ticker_share payını,
+    sektör bölümü kalan payı alır; bir bölümün kullanmadığı pay diğerine devredilir.
+    Bütçe bölüm başlıklarına ("Yok." dahil) bile yetmiyorsa çıktı bütçeye kırpılır, şirket bölümü önce.
+
+    near_dupe=True ise SimHash tabanlı yakın kopya tespiti iki bölüm arasında ortak çalışır:
+    şirket akışında geçen bir haber sektör akışında tekrar yer almaz. Birden çok çağrı arasında
+    paylaşmak için dedupe_index verilebilir.
     """
 
+    # dışarıdan verilen dedupe_index durum taşır: o durumda bağlam memo'su kullanılmaz
+    memo_key = None
+    if dedupe_index is None:
+        t_ids = tuple(it.get("uuid") for it in ticker_news or [])
+        i_ids = tuple(it.get("uuid") for it in industry_news or [])
+        if all(t_ids) and all(i_ids):
+            memo_key = (
+                symbol,
+                industry,
+                t_ids,
+                i_ids,
+                include_url,
+                max_items,
+                max_snippet_chars,
+                budget_chars,
+                budget_tokens,
+                ticker_share,
+                near_dupe,
+            )
+            cached = _context_memo.get(memo_key)
+            if cached is not None:
+                return cached
+
     sym = _clean_text(symbol)
     ind = _clean_text(industry)
 
-    # aynı url/title tekrarlarını azalt
-    def _dedupe(items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-        seen = set()
-        out = []
-        for it in items or []:
-            key = (_clean_text(str(it.get("url") or "")) or _clean_text(str(it.get("title") or ""))).lower()
-            if not key:
-                continue
-            if key in seen:
-                continue
-            seen.add(key)
-            out.append(it)
-            if len(out) >= max_items:
-                break
-        return out
-
-    t_items = _dedupe(ticker_news)[:max_items]
-    i_items = _dedupe(industry_news)[:max_items]
-
-    ticker_lines = []
-    if sym:
-        ticker_lines.append(f"SYMBOL: {sym}")
-    ticker_lines.append("Şirket Haberleri:")
-    if not t_items:
-        ticker_lines.append("Yok.")
-    else:
-        for idx, it in enumerate(t_items, start=1):
-            ticker_lines.append(
-                _format_item(
-                    it,
-                    idx=idx,
-                    label="Şirket Haberi",
-                    include_url=include_url,
-                    max_snippet_chars=max_snippet_chars,
-                )
-            )
-            ticker_lines.append("")  # boş satır
-
-    industry_lines = []
-    if ind:
-        industry_lines.append(f"INDUSTRY: {ind}")
-    industry_lines.append("Sektör Haberleri:")
-    if not i_items:
-        industry_lines.append("Yok.")
-    else:
-        for idx, it in enumerate(i_items, start=1):
-            industry_lines.append(
-                _format_item(
-                    it,
-                    idx=idx,
-                    label="Sektör Haberi",
-                    include_url=include_url,
-                    max_snippet_chars=max_snippet_chars,
-                )
+    if near_dupe and dedupe_index is None:
+        dedupe_index = NearDupIndex()
+
+    def section(header: str, items: List[Dict[str, Any]], label: str) -> _Section:
+        def fmt(it: Dict[str, Any], idx: int) -> str:
+            return _format_item(
+                it, idx=idx, label=label, include_url=include_url, max_snippet_chars=max_snippet_chars
             )
-            industry_lines.append("")
 
-    ticker_context = "\n".join([x for x in ticker_lines if x is not None]).strip()
-    industry_context = "\n".join([x for x in industry_lines if x is not None]).strip()
+        return _Section(
+            header, _candidates(items, dedupe_index), fmt, max_items=max_items, dedupe_index=dedupe_index
+        )
+
+    t_sec = section(_header("SYMBOL", sym, "Şirket Haberleri:"), ticker_news, "Şirket Haberi")
+    i_sec = section(_header("INDUSTRY", ind, "Sektör Haberleri:"), industry_news, "Sektör Haberi")
+
+    budget = budget_chars
+    if budget_tokens is not None:
+        tok_chars = budget_tokens * CHARS_PER_TOKEN
+        budget = tok_chars if budget is None else min(budget, tok_chars)
+
+    if budget is None:
+        unlimited = sys.maxsize
+        t_sec.fill(unlimited)
+        i_sec.fill(unlimited)
+    else:
+        t_sec.fill(int(budget * ticker_share))
+        i_sec.fill(budget - t_sec.used)
+        # sektör bölümü payını bitirmediyse artanı şirket bölümüne ver
+        t_sec.fill(budget - i_sec.used)
 
-    return ticker_context, industry_context
+    out = (t_sec.render(), i_sec.render())
+    if budget is not None and len(out[0]) + len(out[1]) > budget:
+        # sadece başlıklar bütçeyi aşabilir (bloklar bütçeye sığmadıkça alınmaz)
+        t_out = out[0][: max(0, budget)]
+        out = (t_out, out[1][: max(0, budget - len(t_out))])
+    if memo_key is not None:
+        _context_memo.put(memo_key, out)
+    return out
@@ -0,0 +1,165 @@
+import argparse
+import logging
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Dict, Optional, Tuple
+
+from src.integrations.marketaux import get_ticker_and_industry_news
+from src.models.inference import get_prediction_table
+from src.reports.delivery import SmtpPool, deliver, make_message
+from src.reports.news_prompt import build_llm_context
+from src.reports.subscribers import CADENCES, SubscriberStore, get_subscriber_store
+from src.universe import TICKERS
+
+RENDER_WORKERS = 4
+HORIZON_LABELS = {"short": "Kısa", "mid": "Orta", "long": "Uzun"}
+
+_LABELS = {v: k for k, v in TICKERS.items()}
+
+logger = logging.getLogger(__name__)
+
+
+def _model_section(ticker: str) -> str:
+    table = get_prediction_table()
+    lines = []
+    for horizon, label in HORIZON_LABELS.items():
+        row = table.lookup(ticker, horizon)
+        if not row:
+            continue
+        lines.append(
+            f"- {label} vade: beklenen getiri %{row['expected_return']}, volatilite %{row['volatility']}, "
+            f"güven %{row['confidence']} (ayı %{row['bear']} / baz %{row['base']} / boğa %{row['bull']})"
+        )
+    if not lines:
+        return "Model Çıktıları:\nYok."
+    return f"Model Çıktıları (sürüm {table.version}, veri tarihi {table.asof}):\n" + "\n".join(lines)
+
+
+def render_report(ticker: str, label: str = "") -> Optional[Tuple[str, str]]:
+    """
+    Ticker raporunun (konu, gövde) çifti: model çıktıları + LLM haber bağlamı.
+    Haberler alınamazsa None: eksik rapor gönderilmez. Hata metni (istek URL'si ve token'ı içerebilir)
+    sadece sunucu loguna yazılır, gövdeye girmez.
+    """
+    label = label or _LABELS.get(ticker, ticker)
+    today = datetime.now().strftime("%Y-%m-%d")
+    parts = [f"FinAnalytics Raporu — {label} ({ticker}) — {today}", _model_section(ticker)]
+    try:
+        res = get_ticker_and_industry_news(ticker, company_name=label, country="us", n=10)
+        ticker_ctx, industry_ctx = build_llm_context(
+            symbol=res.get("symbol", ""),
+            industry=res.get("industry", ""),
+            ticker_news=res.get("ticker_news", []),
+            industry_news=res.get("industry_news", []),
+            near_dupe=True,
+        )
+        parts += [ticker_ctx, industry_ctx]
+    except Exception:
+        logger.exception("Rapor haberleri alınamadı: %s", ticker)
+        return None
+    return f"FinAnalytics: {label} ({ticker}) raporu {today}", "\n\n".join(parts)
+
+
+def run_due(
+    *,
+    now: Optional[float] = None,
+    store: Optional[SubscriberStore] = None,
+    pool: Optional[SmtpPool] = None,
+    render_workers: int = RENDER_WORKERS,
+) -> Dict[str, Any]:
+    """
+    Gönderimi gelen abonelikleri ticker'a göre gruplar; her ticker raporu bir kez üretilir ve
+    tüm abonelerine aynı gövdeyle gönderilir. İş maliyeti abone sayısıyla değil ticker sayısıyla büyür.
+    Raporu üretilemeyen ticker'lar "skipped" listesine girer; abonelikleri işaretlenmez, sonraki turda tekrar denenir.
+    """
+    store = store or get_subscriber_store()
+    t0 = time.perf_counter()
+    due = store.due(now)
+    if not due:
+        return {"tickers": 0, "sent": 0, "failed": [], "skipped": [], "seconds": 0.0}
+
+    with ThreadPoolExecutor(max_workers=max(1, render_workers), thread_name_prefix="report-render") as ex:
+        rendered = dict(zip(due, ex.map(render_report, due)))
+
+    # mesaj -> (e-posta, ticker): abonelik anahtarı mesajın kendisine (alıcıya giden başlıklara) yazılmaz
+    messages = []
+    jobs: Dict[int, Tuple[str, str]] = {}
+    skipped = []
+    for ticker, emails in due.items():
+        if rendered[ticker] is None:
+            skipped.append(ticker)
+            continue
+        subject, body = rendered[ticker]
+        for email in emails:
+            msg = make_message(email, subject, body)
+            jobs[id(msg)] = (email, ticker)
+            messages.append(msg)
+
+    res = deliver(messages, pool)
+    store.mark_sent(jobs[id(m)] for m in res["sent"])
+    return {
+        "tickers": len(rendered),
+        "sent": len(res["sent"]),
+        "failed": [(*jobs[id(m)], err) for m, err in res["failed"]],
+        "skipped": skipped,
+        "seconds": round(time.perf_counter() - t0, 3),
+    }
+
+
+def send_test_report(email: str, ticker: str, label: str = "", pool: Optional[SmtpPool] = None) -> None:
+    """Tek bir alıcıya hemen rapor gönderir (abonelik zamanını etkilemez); hata olursa fırlatır."""
+    report = render_report(ticker, label)
+    if report is None:
+        raise RuntimeError("Rapor hazırlanamadı: haberler alınamadı, daha sonra tekrar deneyin")
+    subject, body = report
+    res = deliver([make_message(email, subject, body)], pool)
+    if res["failed"]:
+        raise RuntimeError(res["failed"][0][1])
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Rapor abonelikleri ve zamanlanmış gönderim")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    sub.add_parser("run", help="Gönderimi gelen raporları bir kez gönder")
+    loop = sub.add_parser("loop", help="Belirli aralıklarla run")
+    loop.add_argument("--interval", type=float, default=900)
+    s = sub.add_parser("subscribe")
+    s.add_argument("email")
+    s.add_argument("tickers", nargs="+")
+    s.add_argument("--cadence", choices=list(CADENCES), default="daily")
+    u = sub.add_parser("unsubscribe")
+    u.add_argument("email")
+    u.add_argument("ticker", nargs="?")
+    sub.add_parser("due", help="Gönderimi gelen abonelikleri listele")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+
+    store = get_subscriber_store()
+    if args.cmd == "subscribe":
+        for t in args.tickers:
+            store.subscribe(args.email, t, args.cadence)
+    elif args.cmd == "unsubscribe":
+        print(f"{store.unsubscribe(args.email, args.ticker)} abonelik silindi")
+    elif args.cmd == "due":
+        for ticker, emails in store.due().items():
+            print(ticker, len(emails))
+    else:
+        while True:
+            with SmtpPool() as pool:
+                res = run_due(store=store, pool=pool)
+            print(
+                f"{res['tickers']} ticker, {res['sent']} gönderildi, {len(res['failed'])} hata, "
+                f"{len(res['skipped'])} ertelendi, {res['seconds']} sn"
+            )
+            for to, ticker, err in res["failed"]:
+                print(f"  {to} {ticker}: {err}", file=sys.stderr)
+            if args.cmd == "run":
+                break
+            time.sleep(args.interval)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,122 @@
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+REPORT_DB_PATH = Path(os.getenv("REPORT_DB", ".cache/reports.sqlite3"))
+
+# rapor sıklığı -> saniye; gönderim döngüsündeki kaymaya karşı bir saatlik pay bırakılır
+CADENCES: Dict[str, int] = {"daily": 86400, "weekly": 7 * 86400}
+DUE_SLACK = 3600
+
+
+class SubscriberStore:
+    """
+    Rapor abonelikleri için kalıcı depo (SQLite, WAL).
+      - subscribers: (email, ticker) -> sıklık, oluşturulma ve son gönderim zamanı
+    due() gönderimi gelen abonelikleri ticker'a göre gruplar: rapor ticker başına bir kez üretilir.
+    """
+
+    def __init__(self, path: Path = REPORT_DB_PATH) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+
+        conn = self._conn()
+        conn.execute("PRAGMA journal_mode=WAL")
+        with conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS subscribers ("
+                " email TEXT NOT NULL, ticker TEXT NOT NULL, cadence TEXT NOT NULL,"
+                " created_at REAL NOT NULL, last_sent_at REAL,"
+                " PRIMARY KEY (email, ticker))"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_subscribers_ticker ON subscribers (ticker)")
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(str(self.path), timeout=30)
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA busy_timeout=30000")
+            self._local.conn = conn
+        return conn
+
+    def subscribe(self, email: str, ticker: str, cadence: str = "daily") -> None:
+        if cadence not in CADENCES:
+            raise ValueError(f"Bilinmeyen rapor sıklığı: {cadence}")
+        conn = self._conn()
+        with conn:
+            conn.execute(
+                "INSERT INTO subscribers (email, ticker, cadence, created_at) VALUES (?, ?, ?, ?)"
+                " ON CONFLICT (email, ticker) DO UPDATE SET cadence = excluded.cadence",
+                (email.strip().lower(), ticker.strip().upper(), cadence, time.time()),
+            )
+
+    def unsubscribe(self, email: str, ticker: Optional[str] = None) -> int:
+        conn = self._conn()
+        with conn:
+            if ticker is None:
+                cur = conn.execute("DELETE FROM subscribers WHERE email = ?", (email.strip().lower(),))
+            else:
+                cur = conn.execute(
+                    "DELETE FROM subscribers WHERE email = ? AND ticker = ?",
+                    (email.strip().lower(), ticker.strip().upper()),
+                )
+        return cur.rowcount
+
+    def for_email(self, email: str) -> List[Dict[str, object]]:
+        cur = self._conn().execute(
+            "SELECT ticker, cadence, last_sent_at FROM subscribers WHERE email = ? ORDER BY ticker",
+            (email.strip().lower(),),
+        )
+        return [{"ticker": t, "cadence": c, "last_sent_at": s} for t, c, s in cur]
+
+    def count(self) -> int:
+        return int(self._conn().execute("SELECT COUNT(*) FROM subscribers").fetchone()[0])
+
+    def due(self, now: Optional[float] = None) -> Dict[str, List[str]]:
+        """Gönderimi gelmiş abonelikler: {TICKER: [email, ...]}"""
+        now = time.time() if now is None else now
+        clauses = " OR ".join("(cadence = ? AND last_sent_at <= ?)" for _ in CADENCES)
+        params: List[object] = []
+        for cadence, period in CADENCES.items():
+            params += [cadence, now - period + DUE_SLACK]
+        cur = self._conn().execute(
+            f"SELECT ticker, email FROM subscribers WHERE last_sent_at IS NULL OR {clauses} ORDER BY ticker",
+            params,
+        )
+        out: Dict[str, List[str]] = {}
+        for ticker, email in cur:
+            out.setdefault(ticker, []).append(email)
+        return out
+
+    def mark_sent(self, pairs: Iterable[Tuple[str, str]], ts: Optional[float] = None) -> None:
+        ts = time.time() if ts is None else ts
+        conn = self._conn()
+        with conn:
+            conn.executemany(
+                "UPDATE subscribers SET last_sent_at = ? WHERE email = ? AND ticker = ?",
+                [(ts, email, ticker) for email, ticker in pairs],
+            )
+
+
+_store_obj: Optional[SubscriberStore] = None
+_store_lock = threading.Lock()
+
+
+def get_subscriber_store() -> SubscriberStore:
+    global _store_obj
+    if _store_obj is None:
+        with _store_lock:
+            if _store_obj is None:
+                _store_obj = SubscriberStore()
+    return _store_obj
+
+
+def set_subscriber_store(store: Optional[SubscriberStore]) -> None:
+    global _store_obj
+    with _store_lock:
+        _store_obj = store
@@ -0,0 +1,42 @@
+from typing import Dict
+
+# Dashboard ve batch işlerin ortak hisse evreni: görünen ad -> ticker
+TICKERS: Dict[str, str] = {
+    "Apple": "AAPL",
+    "Microsoft": "MSFT",
+    "NVIDIA": "NVDA",
+    "Conagra Brands": "CAG",
+    "Hershey": "HSY",
+    "Coca-Cola Europacific Partners": "CCEP",
+    "Kroger": "KR",
+    "Sysco": "SYY",
+    "Campbell Soup Company": "CPB",
+    "Keurig Dr Pepper": "KDP",
+    "PepsiCo": "PEP",
+    "Tyson Foods": "TSN",
+    "JM Smucker": "SJM",
+    "Kraft Heinz": "KHC",
+    "Philip Morris International": "PM",
+    "Altria": "MO",
+    "Hormel Foods": "HRL",
+    "Estée Lauder": "EL",
+    "Colgate-Palmolive": "CL",
+    "Kellogg": "K",
+    "General Mills": "GIS",
+    "Kimberly-Clark": "KMB",
+    "Clorox": "CLX",
+    "McCormick & Company": "MKC",
+    "Coca-Cola": "KO",
+    "Walmart": "WMT",
+    "Costco": "COST",
+    "Dollar General": "DG",
+    "Dollar Tree": "DLTR",
+    "Walgreens Boots Alliance": "WBA",
+    "Monster Beverage": "MNST",
+    "Constellation Brands": "STZ",
+    "Mondelez International": "MDLZ",
+    "Molson Coors": "TAP",
+    "Lamb Weston": "LW",
+    "Church & Dwight": "CHD",
+    "Brown-Forman": "BF.B",
+}
@@ -0,0 +1,58 @@
+import asyncio
+
+import httpx
+import pytest
+
+from bench.mock_marketaux import MockConfig, start_in_thread
+from src.integrations import marketaux, marketaux_async
+
+
+@pytest.fixture
+def mock_api(monkeypatch):
+    server, url = start_in_thread(MockConfig(latency_ms=5, jitter_ms=0))
+    monkeypatch.setattr(marketaux, "BASE", url)
+    # kullanım sayacı yerel haber deposuna yazılmasın
+    monkeypatch.setattr(marketaux, "NEWS_STORE_ENABLED", False)
+    monkeypatch.setenv("MARKETAUX_API_TOKEN", "secret-token")
+    marketaux.reset_metrics()
+    yield url
+    server.shutdown()
+    marketaux.close_session()
+
+
+def test_async_pagination_on_shared_client(mock_api):
+    async def run():
+        stats = {}
+        try:
+            items = await marketaux_async.get_last_n_news("symbols", "KO", n=10, use_store=False, stats=stats)
+        finally:
+            await marketaux_async.aclose()
+        return items, stats
+
+    items, stats = asyncio.run(run())
+    assert len(items) == 10
+    assert len({it["uuid"] for it in items}) == 10
+    assert stats["requests"] == marketaux.get_metrics()["requests"] == 4  # limit 3 -> 4 sayfa
+
+
+def test_sync_wrapper_matches_async(mock_api):
+    sync_items = marketaux.get_last_n_news("symbols", "KO", n=5, use_store=False)
+
+    async def run():
+        try:
+            return await marketaux_async.get_last_n_news("symbols", "KO", n=5, use_store=False)
+        finally:
+            await marketaux_async.aclose()
+
+    assert [it["uuid"] for it in sync_items] == [it["uuid"] for it in asyncio.run(run())]
+
+
+def test_transport_errors_do_not_leak_token(monkeypatch):
+    monkeypatch.setattr(marketaux, "BASE", "http://127.0.0.1:9/v1")
+    monkeypatch.setattr(marketaux, "NEWS_STORE_ENABLED", False)
+    monkeypatch.setattr(marketaux_async, "MAX_RETRIES", 0)
+    monkeypatch.setenv("MARKETAUX_API_TOKEN", "secret-token")
+    with pytest.raises(httpx.TransportError) as exc:
+        marketaux.get_last_n_news("symbols", "KO", n=3, use_store=False)
+    assert "secret-token" not in str(exc.value)
+    assert exc.value.__suppress_context__
@@ -0,0 +1,85 @@
+import pytest
+
+from src.reports.near_dupe import NearDupIndex, dedupe_text
+
+TITLE = "Coca-Cola raises full-year sales forecast as prices climb"
+BODY = (
+    "Coca-Cola Co raised its annual organic revenue forecast on Tuesday after beating quarterly estimates, "
+    "as higher prices for its sodas and juices offset softer demand in North America. The Atlanta-based "
+    "beverage maker now expects organic revenue growth of 10% for the year, up from its previous forecast "
+    "of 8% to 9%. Shares rose 2% in premarket trading."
+)
+
+
+def _replace_word(text: str, i: int, word: str) -> str:
+    words = text.split()
+    words[i] = word
+    return " ".join(words)
+
+
+# aynı haberin sendikasyon/ajans varyantları: hepsi yakın kopya sayılmalı
+VARIANTS = {
+    "source suffix": (TITLE + " - Reuters", BODY),
+    "source suffix + changed word": (TITLE + " - Reuters", _replace_word(BODY, 12, "significantly")),
+    "two changed words": (TITLE, _replace_word(_replace_word(BODY, 5, "also"), 20, "sharply")),
+    "dateline": (TITLE, "ATLANTA (Reuters) - " + BODY),
+    "dated dateline + pipe suffix + truncation": (TITLE + " | Reuters", "ATLANTA, Oct 14 (Reuters) - " + BODY[:180] + "..."),
+    "update prefix": ("UPDATE 1-" + TITLE, BODY),
+    "update prefix + dateline": ("UPDATE 2-" + TITLE, "NEW YORK (Reuters) - " + BODY),
+    "bloomberg": (TITLE + " - Bloomberg", "(Bloomberg) -- " + BODY),
+    "truncated to 150": (TITLE, BODY[:150]),
+    "truncated to 120": (TITLE, BODY[:120]),
+}
+
+# aynı şirketin farklı haberleri (biri neredeyse aynı şablonla): ayrı kalmalı
+DISTINCT = [
+    (
+        "PepsiCo raises annual sales forecast as prices climb",
+        "PepsiCo Inc raised its annual organic revenue forecast on Tuesday after beating quarterly estimates, "
+        "as higher prices for its snacks and sodas offset softer demand in North America. The Purchase, New "
+        "York-based company now expects organic revenue growth of 10% for the year, up from its previous "
+        "forecast of 8%. Shares rose 1% in premarket trading.",
+    ),
+    (
+        "Coca-Cola raises full-year profit forecast as demand holds up",
+        "Coca-Cola Co raised its annual profit forecast on Tuesday after beating quarterly estimates, as demand "
+        "for its sodas held up despite several rounds of price increases. The Atlanta-based beverage maker now "
+        "expects comparable earnings per share growth of 7% to 8% for the year.",
+    ),
+    (
+        "Coca-Cola beats quarterly profit estimates on strong overseas demand",
+        "Coca-Cola Co beat Wall Street estimates for quarterly profit on Wednesday, helped by strong demand for "
+        "its drinks in Latin America and Asia and price increases that held up better than expected. Revenue "
+        "rose 3% to $11.9 billion.",
+    ),
+    (
+        "Coca-Cola to cut 4% of global workforce in restructuring",
+        "Coca-Cola Co said on Thursday it would eliminate about 4% of its global workforce as part of a "
+        "restructuring aimed at simplifying its portfolio and reducing costs. Severance costs are expected to "
+        "total about $350 million.",
+    ),
+]
+
+
+def _article(title: str, description: str) -> dict:
+    return {"title": title, "description": description}
+
+
+def test_dedupe_text_strips_wire_boilerplate():
+    base = dedupe_text(_article(TITLE, BODY))
+    for title, body in (VARIANTS["update prefix + dateline"], VARIANTS["bloomberg"], VARIANTS["source suffix"]):
+        assert dedupe_text(_article(title, body)) == base
+
+
+@pytest.mark.parametrize("name", list(VARIANTS))
+def test_syndicated_variants_are_near_duplicates(name):
+    index = NearDupIndex()
+    assert index.check_and_add(_article(TITLE, BODY))
+    assert not index.check_and_add(_article(*VARIANTS[name])), name
+
+
+def test_distinct_stories_are_kept():
+    index = NearDupIndex()
+    assert index.check_and_add(_article(TITLE, BODY))
+    for title, body in DISTINCT:
+        assert index.check_and_add(_article(title, body)), title
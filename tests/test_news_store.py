@@ -0,0 +1,34 @@
+from src.integrations.news_store import NewsStore, stream_relevance
+
+KO_STORY = {
+    "uuid": "a",
+    "published_at": "2026-10-01T10:00:00Z",
+    "title": "KO beats profit estimates on strong growth",
+    "entities": [{"symbol": "KO", "match_score": 50.0}, {"symbol": "PEP", "match_score": 10.0}],
+}
+PEP_STORY = {
+    "uuid": "b",
+    "published_at": "2026-10-01T11:00:00Z",
+    "title": "PEP plunges on weak outlook and loss warning",
+    "entities": [{"symbol": "PEP", "match_score": 80.0}, {"symbol": "KO", "match_score": 8.0}],
+}
+
+
+def test_stream_relevance_is_relative_match_score():
+    assert stream_relevance("symbols", "KO", KO_STORY) == 1.0
+    assert stream_relevance("symbols", "ko", PEP_STORY) == 0.1
+    assert stream_relevance("symbols", "KO", {"entities": []}) is None
+
+
+def test_sentiment_daily_weights_by_stream_relevance(tmp_path):
+    store = NewsStore(tmp_path / "news.sqlite3")
+    store.upsert("symbols", "KO", [KO_STORY, PEP_STORY])
+    store.upsert("symbols", "PEP", [KO_STORY, PEP_STORY])
+    store.put_sentiment([("a", 0.8, 1.0, 4), ("b", -0.6, 1.0, 4)], "test")
+
+    # aynı iki makale, iki akışta: her akışın günlük skoru kendi asıl haberine yakın olmalı
+    (_, n, avg, ko, _), = store.sentiment_daily("symbols", "KO")
+    (_, _, _, pep, _), = store.sentiment_daily("symbols", "PEP")
+    assert n == 2 and abs(avg - 0.1) < 1e-9
+    assert abs(ko - (0.8 * 1.0 - 0.6 * 0.1) / 1.1) < 1e-9
+    assert abs(pep - (0.8 * 0.2 - 0.6 * 1.0) / 1.2) < 1e-9